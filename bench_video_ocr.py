@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+bench_video_ocr.py — micro-benchmarks for the extraction paths in video_ocr.py.
+
+Each benchmark runs against a real video (--video) or a synthetic slide deck that is rendered
+on the fly (--synth <minutes>).  Nothing is written next to the input; timings are printed.
+
+Usage examples:
+  # Seek-based vs linear sampling on a synthetic 60-minute, 30 fps deck
+  python bench_video_ocr.py sampling --synth 60
+
+  # Same comparison on a real lecture with a 10-second cadence
+  python bench_video_ocr.py sampling --video lecture.mp4 --interval 10
+
+  # Linear-walk throughput: read() on every frame vs grab() with retrieve() only on snapshots
+  python bench_video_ocr.py walk --synth 10
+
+  # Change detection over a full decode vs keyframes only, both via ffmpeg, plus OpenCV (needs ffmpeg)
+  python bench_video_ocr.py keyframes --video slides.mp4
+
+  # Decoder backends: OpenCV vs ffmpeg pipe (full-rate, 1 fps, scaled, grayscale)
+  python bench_video_ocr.py decoders --synth 5
+
+  # Slide start times: dense change scan of every frame vs a 5 s scan refined by bisection
+  python bench_video_ocr.py bisect --synth 10 --slide-seconds 37.3 --scan-step 5
+
+  # Text-only runs: JPEG snapshots re-read for OCR vs frames piped to tesseract from memory
+  python bench_video_ocr.py diskless --video lecture.mp4 --interval 60
+
+  # Handing frames to another process: pickled through a queue vs a shared-memory ring
+  python bench_video_ocr.py ring --synth 1
+
+  # Per-image OCR latency: tesseract binary via pytesseract vs a persistent tesserocr engine
+  python bench_video_ocr.py engines --video lecture.mp4 --interval 60
+
+  # Snapshot formats: encode time, bytes on disk and OCR character error rate (needs tesseract)
+  python bench_video_ocr.py encoding --video lecture.mp4 --interval 60 [--truth lecture_truth.txt]
+"""
+import argparse, multiprocessing, os, statistics, tempfile, time, cv2, pytesseract
+import numpy as np
+from pathlib import Path
+from typing import Callable, Iterator, List
+
+import video_ocr
+
+def synth_video(path: Path, minutes: float, *, fps: float = 30.0, size: tuple[int, int] = (1280, 720), slide_seconds: float = 45.0) -> Path:
+    """Render a slide-deck-like video: a new numbered slide every *slide_seconds*, static in between."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    if not writer.isOpened():
+        raise RuntimeError(f"Unable to create {path}")
+    w, h = size
+    slide = None
+    for frame_no in range(int(minutes * 60 * fps)):
+        if frame_no % int(slide_seconds * fps) == 0:
+            n = frame_no // int(slide_seconds * fps)
+            slide = np.full((h, w, 3), 255, np.uint8)
+            cv2.putText(slide, f"Slide {n}", (w // 10, h // 4), cv2.FONT_HERSHEY_SIMPLEX, 2.5, (0, 0, 0), 5)
+            for line in range(n % 4 + 2):
+                cv2.putText(slide, f"Bullet point {line} of slide {n}", (w // 10, h // 4 + 90 * (line + 1)), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (40, 40, 40), 2)
+        writer.write(slide)
+    writer.release()
+    return path
+
+def _time_sampler(video: Path, sampler: Callable[..., Iterator], *args) -> tuple[float, int]:
+    """Drain *sampler* over a fresh capture; return (seconds, snapshots produced)."""
+    cap = cv2.VideoCapture(str(video))
+    if not cap.isOpened():
+        raise RuntimeError(f"Unable to open {video}")
+    try:
+        start = time.perf_counter()
+        count = sum(1 for _ in sampler(cap, *args))
+        return time.perf_counter() - start, count
+    finally:
+        cap.release()
+
+def bench_sampling(video: Path, interval: float) -> None:
+    """Compare seek-based sampling against decoding every frame."""
+    cap = cv2.VideoCapture(str(video))
+    fps, frames = cap.get(cv2.CAP_PROP_FPS) or 30.0, cap.get(cv2.CAP_PROP_FRAME_COUNT)
+    cap.release()
+    print(f"{video.name}: {frames:.0f} frames @ {fps:.2f} fps ({frames / fps / 60:.1f} min), interval {interval}s")
+    for name, sampler in (("linear", video_ocr._sample_linear), ("seek", video_ocr._sample_seek)):
+        seconds, count = _time_sampler(video, sampler, interval)
+        print(f"  {name:<8} {seconds:8.2f}s  {count:5d} snapshots  {seconds / max(count, 1) * 1000:8.1f} ms/snapshot")
+
+def _walk_read(cap: cv2.VideoCapture, interval_seconds: float) -> Iterator[np.ndarray]:
+    """The original linear loop: full decode + BGR conversion of every frame via read()."""
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_interval = int(round(fps * interval_seconds)) or 1
+    frame_no = 0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        if frame_no % frame_interval == 0:
+            yield frame
+        frame_no += 1
+
+def bench_walk(video: Path, interval: float) -> None:
+    """Report frames/sec walked by the linear loop with read() everywhere vs grab()/retrieve()."""
+    cap = cv2.VideoCapture(str(video))
+    frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+    cap.release()
+    print(f"{video.name}: {frames:.0f} frames, interval {interval}s")
+    for name, sampler in (("read", _walk_read), ("grab", video_ocr._sample_linear)):
+        seconds, count = _time_sampler(video, sampler, interval)
+        print(f"  {name:<8} {seconds:8.2f}s  {count:5d} snapshots  {frames / seconds:10.1f} frames/s")
+
+def bench_keyframes(video: Path, scan_step: float) -> None:
+    """Run change-detection extraction over a full decode and over keyframes only, both through
+    the ffmpeg backend so only keyframe skipping differs; the OpenCV full decode is a third row."""
+    print(f"{video.name}: change mode, scan step {scan_step}s")
+    for name, decoder, keyframes_only in (("full", "ffmpeg", False), ("keyframes", "ffmpeg", True), ("opencv", "opencv", False)):
+        cap = video_ocr._open_decoder(video, decoder, keyframes_only=keyframes_only)
+        try:
+            start = time.perf_counter()
+            shots = [t for t, *_ in video_ocr._select_frames(
+                cap, 0.0, float("inf"), interval_seconds=video_ocr.DEFAULT_INTERVAL, sampling="linear", mode="change",
+                scan_step=scan_step, change_threshold=video_ocr.DEFAULT_CHANGE_THRESHOLD, min_dwell=video_ocr.DEFAULT_MIN_DWELL)]
+            seconds = time.perf_counter() - start
+        finally:
+            cap.release()
+        print(f"  {name:<10} {seconds:8.2f}s  {len(shots):5d} slides  first at {[round(t / 1000, 1) for t in shots[:6]]}")
+
+class _CountingCapture:
+    """Wrap a capture and count the frames retrieved (decoded to pixels) through it."""
+
+    def __init__(self, cap: video_ocr.Decoder) -> None:
+        self.cap, self.retrieved = cap, 0
+
+    def retrieve(self, image=None):
+        self.retrieved += 1
+        return self.cap.retrieve(image)
+
+    def __getattr__(self, name: str):
+        return getattr(self.cap, name)
+
+def bench_bisect(video: Path, scan_step: float) -> None:
+    """Find slide start times with a frame-by-frame change scan and with a coarse scan plus bisection."""
+    cap = cv2.VideoCapture(str(video))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    print(f"{video.name}: slide start times, bisect scan step {scan_step}s")
+    for name, mode, sampling, step in (("dense", "change", "linear", 1.0 / fps), ("bisect", "bisect", "seek", scan_step)):
+        cap = _CountingCapture(cv2.VideoCapture(str(video)))
+        try:
+            start = time.perf_counter()
+            shots = [t for t, *_ in video_ocr._select_frames(
+                cap, 0.0, float("inf"), interval_seconds=video_ocr.DEFAULT_INTERVAL, sampling=sampling, mode=mode,
+                scan_step=step, change_threshold=video_ocr.DEFAULT_CHANGE_THRESHOLD, min_dwell=video_ocr.DEFAULT_MIN_DWELL)]
+            seconds = time.perf_counter() - start
+        finally:
+            cap.release()
+        print(f"  {name:<8} {seconds:8.2f}s  {cap.retrieved:7d} frames decoded  {len(shots):5d} slides  first at {[round(t / 1000, 2) for t in shots[:6]]}")
+
+DECODER_CONFIGS = {
+    "opencv": ("opencv", {}),
+    "ffmpeg": ("ffmpeg", {}),
+    "ffmpeg-gray": ("ffmpeg", {"gray": True}),
+    "ffmpeg-640": ("ffmpeg", {"width": 640}),
+    "ffmpeg-1fps": ("ffmpeg", {"fps": 1.0}),
+    "ffmpeg-1fps-640-gray": ("ffmpeg", {"fps": 1.0, "width": 640, "gray": True}),
+}
+
+def bench_decoders(video: Path) -> None:
+    """Walk the whole video with read() through each decoder configuration."""
+    cap = cv2.VideoCapture(str(video))
+    duration = cap.get(cv2.CAP_PROP_FRAME_COUNT) / (cap.get(cv2.CAP_PROP_FPS) or 30.0)
+    cap.release()
+    print(f"{video.name}: {duration / 60:.1f} min")
+    for name, (decoder, options) in DECODER_CONFIGS.items():
+        cap = video_ocr._open_decoder(video, decoder, **options)
+        try:
+            start, frames = time.perf_counter(), 0
+            while cap.read()[0]:
+                frames += 1
+            seconds = time.perf_counter() - start
+        finally:
+            cap.release()
+        print(f"  {name:<22} {seconds:8.2f}s  {frames:7d} frames  {frames / seconds:9.1f} frames/s  {duration / seconds:7.1f}x realtime")
+
+ENCODING_CONFIGS = {
+    "jpeg-q95": ("jpeg", {"jpeg_quality": 95}),
+    "jpeg-q85": ("jpeg", {"jpeg_quality": 85}),
+    "jpeg-q70": ("jpeg", {"jpeg_quality": 70}),
+    "jpeg-q50": ("jpeg", {"jpeg_quality": 50}),
+    "png-c1": ("png", {"png_compression": 1}),
+    "png-c3": ("png", {"png_compression": 3}),
+    "png-c9": ("png", {"png_compression": 9}),
+    "webp-lossless": ("webp", {}),
+    "gray-jpeg-q85": ("jpeg", {"jpeg_quality": 85, "gray": True}),
+    "gray-png-c3": ("png", {"png_compression": 3, "gray": True}),
+    "gray-webp-lossless": ("webp", {"gray": True}),
+}
+
+def _edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance, two-row dynamic programme."""
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+def _cer(reference: str, hypothesis: str) -> float:
+    """Character error rate on whitespace-normalised text."""
+    ref, hyp = " ".join(reference.split()), " ".join(hypothesis.split())
+    return _edit_distance(ref, hyp) / max(len(ref), 1)
+
+def _ocr_bytes(data: bytes, ext: str, lang: str) -> str:
+    """OCR an encoded image exactly the way ocr_snapshots does: written to an *ext* file, then
+    video_ocr._ocr_file on its path."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f"snapshot{ext}"
+        path.write_bytes(data)
+        return video_ocr._ocr_file(path, lang)
+
+def bench_encoding(video: Path, interval: float, lang: str, truth: Path | None) -> None:
+    """Encode sampled frames in every snapshot format; report time, size and OCR error rate.
+
+    The reference text is *truth* (one block per sampled frame, separated by form feeds) when
+    given, otherwise the OCR of the lossless PNG encoding, so the error rate isolates what the
+    codec costs.
+    """
+    cap = cv2.VideoCapture(str(video))
+    frames = [frame.copy() for _, frame in video_ocr._sample_seek(cap, interval)]  # the sampler reuses its buffer
+    cap.release()
+    print(f"{video.name}: {len(frames)} frames sampled every {interval}s, {frames[0].shape[1]}x{frames[0].shape[0]}")
+
+    try:
+        pytesseract.get_tesseract_version()
+        have_ocr = True
+    except Exception:
+        have_ocr = False
+        print("  (tesseract not found: skipping OCR error rates)")
+    references: List[str] = []
+    if have_ocr:
+        if truth is not None:
+            references = truth.read_text(encoding="utf-8").split("\f")
+        else:
+            params = video_ocr._imwrite_params("png", 0, 0)
+            references = [_ocr_bytes(cv2.imencode(".png", f, params)[1].tobytes(), ".png", lang) for f in frames]
+
+    for name, (fmt, options) in ENCODING_CONFIGS.items():
+        enc = video_ocr._snapshot_encoding(fmt, **options)
+        params = video_ocr._imwrite_params(fmt, enc["jpeg_quality"], enc["png_compression"])
+        ext = video_ocr.SNAPSHOT_FORMATS[fmt]
+        start, blobs = time.perf_counter(), []
+        for frame in frames:
+            img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if enc["gray"] else frame
+            blobs.append(cv2.imencode(ext, img, params)[1].tobytes())
+        seconds = time.perf_counter() - start
+        size = sum(len(b) for b in blobs)
+        cer = "n/a"
+        if have_ocr:
+            errors = [_cer(ref, _ocr_bytes(blob, ext, lang)) for ref, blob in zip(references, blobs)]
+            cer = f"{100 * sum(errors) / len(errors):6.2f}%"
+        print(f"  {name:<20} {seconds / len(frames) * 1000:7.1f} ms/img  {size / len(frames) / 1024:8.1f} KiB/img  CER {cer}")
+
+def _cpu_seconds() -> float:
+    """User + system CPU time of this process and its finished children (tesseract runs)."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+def bench_diskless(video: Path, interval: float, lang: str) -> None:
+    """OCR sampled frames through JPEG snapshots on disk vs straight from memory (--no-keep-snapshots)."""
+    cap = cv2.VideoCapture(str(video))
+    frames = [frame.copy() for _, frame in video_ocr._sample_seek(cap, interval)]  # the sampler reuses its buffer
+    cap.release()
+    print(f"{video.name}: {len(frames)} frames sampled every {interval}s")
+    pytesseract.get_tesseract_version()  # fail early without the binary
+
+    params = video_ocr._imwrite_params("jpeg", video_ocr.DEFAULT_JPEG_QUALITY, 0)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("jpeg", "memory"):
+            start, cpu, written = time.perf_counter(), _cpu_seconds(), 0
+            for idx, frame in enumerate(frames):
+                if name == "jpeg":
+                    path = Path(tmp) / video_ocr.SNAP_NAME_TEMPLATE.format(idx=idx, ext=".jpg")
+                    cv2.imwrite(str(path), frame, params)
+                    written += path.stat().st_size
+                    video_ocr._ocr_file(path, lang)
+                else:
+                    video_ocr._ocr_array(frame, lang)
+            seconds, cpu = time.perf_counter() - start, _cpu_seconds() - cpu
+            print(f"  {name:<8} {seconds:8.2f}s wall  {cpu:8.2f}s CPU  {written / 2**20:8.2f} MiB snapshots written and re-read")
+
+def bench_engines(video: Path, interval: float, lang: str) -> None:
+    """Per-image OCR latency of the "cli" and "tesserocr" engines on the same PNG snapshots."""
+    cap = cv2.VideoCapture(str(video))
+    frames = [frame.copy() for _, frame in video_ocr._sample_seek(cap, interval)]
+    cap.release()
+    print(f"{video.name}: {len(frames)} frames sampled every {interval}s")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(tmp) / video_ocr.SNAP_NAME_TEMPLATE.format(idx=idx, ext=".png") for idx in range(len(frames))]
+        for path, frame in zip(paths, frames):
+            cv2.imwrite(str(path), frame)
+        for engine in video_ocr.OCR_ENGINES:
+            video_ocr._check_ocr_engine(engine)
+            latencies, texts = [], []
+            for path in paths:
+                start = time.perf_counter()
+                texts.append(video_ocr._ocr_file(path, lang, engine))
+                latencies.append((time.perf_counter() - start) * 1000.0)
+            results[engine] = texts
+            rest = latencies[1:] or latencies
+            print(f"  {engine:<10} first {latencies[0]:8.1f} ms  median {statistics.median(rest):8.1f} ms  "
+                  f"mean {statistics.mean(rest):8.1f} ms  total {sum(latencies) / 1000:8.2f}s")
+    same = sum(a == b for a, b in zip(*results.values()))
+    print(f"  identical text on {same}/{len(frames)} images")
+
+def _ring_consumer(shm, slot_bytes: int, tasks: multiprocessing.Queue, free: multiprocessing.Queue, done: multiprocessing.Queue) -> None:
+    """Touch every frame handed over, either pickled in the task or as a ring slot."""
+    total = 0
+    while (task := tasks.get()) is not None:
+        slot, shape, frame = task
+        if frame is None:
+            frame = np.ndarray(shape, np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+            total += int(frame[::64, ::64].sum())
+            del frame
+            free.put(slot)
+        else:
+            total += int(frame[::64, ::64].sum())
+    done.put(total)
+
+def bench_ring(video: Path, count: int = 200) -> None:
+    """Frames/s handed to a consumer process, pickled through a queue vs via video_ocr._FrameRing."""
+    cap = cv2.VideoCapture(str(video))
+    ok, frame = cap.read()
+    cap.release()
+    if not ok:
+        raise RuntimeError(f"Unable to read {video}")
+    print(f"{video.name}: {count} frames of {frame.shape[1]}x{frame.shape[0]} ({frame.nbytes / 2**20:.1f} MiB) to one consumer process")
+    for name in ("pickle", "ring"):
+        ring = video_ocr._FrameRing(4, frame.nbytes)
+        tasks, done = multiprocessing.Queue(maxsize=4), multiprocessing.Queue()
+        consumer = multiprocessing.Process(target=_ring_consumer, args=(ring.shm, frame.nbytes, tasks, ring.free, done))
+        consumer.start()
+        try:
+            start = time.perf_counter()
+            for _ in range(count):
+                if name == "ring":
+                    tasks.put((ring.put(frame, consumer.is_alive), frame.shape, None))
+                else:
+                    tasks.put((-1, frame.shape, frame))
+            tasks.put(None)
+            done.get()
+            seconds = time.perf_counter() - start
+        finally:
+            consumer.join()
+            ring.close()
+        print(f"  {name:<8} {seconds:8.2f}s  {count / seconds:8.1f} frames/s")
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark video_ocr extraction paths.")
+    parser.add_argument("benchmark", choices=["sampling", "walk", "keyframes", "decoders", "encoding", "bisect", "diskless", "ring", "engines"], help="Which benchmark to run.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", type=Path, help="Video file to benchmark against.")
+    source.add_argument("--synth", type=float, metavar="MINUTES", help="Render a synthetic slide deck of this length.")
+    parser.add_argument("--interval", type=float, default=video_ocr.DEFAULT_INTERVAL, help="Snapshot interval in seconds.")
+    parser.add_argument("--lang", default="eng", help="Tesseract language codes for OCR benchmarks.")
+    parser.add_argument("--truth", type=Path, help="Encoding benchmark: ground-truth text, one form-feed separated block per sampled frame.")
+    parser.add_argument("--scan-step", type=float, default=video_ocr.DEFAULT_SCAN_STEP, help="Change-mode scan step in seconds.")
+    parser.add_argument("--slide-seconds", type=float, default=45.0, help="Synthetic deck: seconds each slide stays on screen.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = args.video.expanduser().resolve() if args.video else synth_video(Path(tmp) / "synth.mp4", args.synth, slide_seconds=args.slide_seconds)
+        if args.benchmark == "sampling":
+            bench_sampling(video, args.interval)
+        elif args.benchmark == "walk":
+            bench_walk(video, args.interval)
+        elif args.benchmark == "keyframes":
+            bench_keyframes(video, args.scan_step)
+        elif args.benchmark == "decoders":
+            bench_decoders(video)
+        elif args.benchmark == "encoding":
+            bench_encoding(video, args.interval, args.lang, args.truth)
+        elif args.benchmark == "bisect":
+            bench_bisect(video, args.scan_step)
+        elif args.benchmark == "diskless":
+            bench_diskless(video, args.interval, args.lang)
+        elif args.benchmark == "ring":
+            bench_ring(video)
+        elif args.benchmark == "engines":
+            bench_engines(video, args.interval, args.lang)
+
+if __name__ == "__main__":
+    _cli()
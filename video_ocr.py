@@ -5,6 +5,8 @@ video_ocr.py — utilities to list video files, take periodic snapshots from a v
 Dependencies:
   - Python: pip install opencv-python pillow pytesseract
   - External: You also need the Tesseract binary installed
+  - Optional: the ffmpeg binary, for --decoder ffmpeg / --keyframes
+  - Optional: pip install tesserocr, for --ocr-engine tesserocr
 
 Flags:
   --video <file>     Process a single video file (mutually exclusive with --dir).
@@ -13,6 +15,43 @@ Flags:
   --snapshots        Extract snapshots from each video.
   --ocr              Run OCR on the extracted snapshots.
   --interval <sec>   Seconds between snapshots (default 30).
+  --sampling <how>   "seek" jumps straight to each snapshot time (default); "linear" walks every frame.
+  --workers <n>      Split each video's timeline across N decoder processes (default 1).
+  --mode <mode>      "interval" snapshots on a fixed cadence (default); "change" only when the slide changes;
+                     "bisect" like change, with slide start times refined by seeking.
+  --scan-step <sec>  Change mode: seconds between analysed frames (default 1).
+  --bisect-resolution <sec>  Bisect mode: precision of the refined slide start times (default 0.04).
+  --change-threshold <f>  Change mode: fraction of pixels that must differ to count as a new slide (default 0.005).
+  --min-dwell <sec>  Change mode: seconds a new slide must stay on screen to be captured (default 1).
+  --decoder <name>   "opencv" (default) or "ffmpeg" (rawvideo pipe; implied by the options below).
+  --keyframes        Decode keyframes only (ffmpeg decoder); combines with --mode interval/change.
+  --decoder-fps <f>  ffmpeg decoder: drop frames down to this rate before they reach Python.
+  --decoder-width <px>  ffmpeg decoder: scale frames (and snapshots) to this width.
+  --decoder-gray     ffmpeg decoder: emit grayscale frames (and snapshots).
+  --crop-slide       Crop every frame to the detected slide rectangle.
+  --deskew           Crop to the detected slide and correct its perspective (camera shots of a screen).
+  --settle-frames <k>  Delay each capture until K consecutive frames are unchanged (transitions done).
+  --dedupe <bits>    Drop snapshots whose perceptual hash is within <bits> (of 256) of a kept one and whose pixels match it.
+  --format <fmt>     Snapshot format: jpeg (default), png or lossless webp.
+  --jpeg-quality <q> JPEG quality 0-100 (default 95).
+  --png-compression <n>  PNG compression level 0-9 (default 3).
+  --gray             Store snapshots as single-channel grayscale.
+  --writer-threads <n>  Background threads encoding/writing snapshots (default 4, 0 = inline).
+  --no-resume        Ignore the checkpoint of an interrupted run and extract from the start.
+  --pipeline         With --snapshots --ocr: OCR each snapshot as soon as it is written.
+  --ocr-threads <n>  Pipeline mode: concurrent tesseract runs per decoder (default: CPU count).
+  --jobs <n>         OCR existing snapshots in N worker processes (default 1).
+  --no-keep-snapshots  With --ocr: OCR frames in memory and write nothing but the text file.
+  --ocr-processes <n>  With --no-keep-snapshots: OCR in N processes fed by a shared-memory ring (default 0: threads).
+  --cv-threads <n>   Size of OpenCV's internal thread pool in each decoder process (default: OpenCV's choice).
+  --decoder-threads <n>  Codec decoding threads per decoder (default: the backend's choice).
+  --auto-threads     Time a few thread settings on the first seconds of each video and use the fastest.
+  --max-memory <size>  Budget for frames in flight between decoder, writer and OCR, e.g. 2G (default: unlimited).
+  --ocr-engine <name>  "cli" runs the tesseract binary per image (default); "tesserocr" keeps libtesseract loaded per worker.
+  --ocr-batch <n>    cli engine: OCR existing snapshots N per tesseract run (default 1).
+  --ocr-cache [path]  Reuse OCR results across runs and videos from a SQLite file (default ~/.cache/video_ocr/ocr_cache.sqlite3).
+  --ocr-cache-size <size>  Text kept in the OCR cache before least recently used entries are evicted (default 256M).
+  --no-incremental   OCR every snapshot again instead of only new or changed ones.
   --lang <codes>     Tesseract language codes, e.g. "eng+fra" (default "eng").
 
 Usage examples:
@@ -30,71 +69,1714 @@ Usage examples:
 
   # 5. Generate snapshots *and* OCR them (30-second cadence)
   python video_ocr.py --dir ~/Movies --snapshots --ocr --interval 30 --lang eng+spa
+
+  # 6. One snapshot per slide instead of per interval
+  python video_ocr.py --video lecture.mp4 --snapshots --ocr --mode change --sampling linear
 """
-import argparse, re, cv2, pytesseract
+import argparse, contextlib, functools, hashlib, json, math, multiprocessing, os, queue, re, shutil, sqlite3, subprocess, sys, tempfile, threading, time, uuid, cv2, pytesseract
+import numpy as np
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
 from pathlib import Path
-from typing import Iterable, List
-from PIL import Image
+from typing import Any, Callable, Iterable, Iterator, List, Protocol
 
 VIDEO_EXTENSIONS: set[str] = {".mp4", ".mov", ".avi", ".mkv", ".flv", ".wmv", ".webm"}
 DEFAULT_INTERVAL = 30  # seconds
-SNAP_NAME_TEMPLATE = "snapshot_{idx:05d}.jpg"
+SNAP_NAME_TEMPLATE = "snapshot_{idx:05d}{ext}"
+SNAPSHOT_FORMATS = {"jpeg": ".jpg", "png": ".png", "webp": ".webp"}  # WebP is written lossless
+DEFAULT_JPEG_QUALITY = 95  # OpenCV's own default
+DEFAULT_PNG_COMPRESSION = 3  # zlib level 0-9; higher is smaller but slower
+SAMPLING_STRATEGIES = ("seek", "linear")
+DEFAULT_SAMPLING = "seek"
+DECODERS = ("opencv", "ffmpeg")
+MANIFEST_NAME = "snapshots.json"
+CHECKPOINT_NAME = ".checkpoint.json"
+CHECKPOINT_SECONDS = 5.0  # minimum wall-clock time between checkpoint writes
+EXTRACTION_MODES = ("interval", "change", "bisect")
+DEFAULT_SCAN_STEP = 1.0  # seconds between analysed frames in change mode
+DEFAULT_BISECT_RESOLUTION = 0.04  # seconds; bisect mode stops refining a transition below this
+DEFAULT_CHANGE_THRESHOLD = 0.005  # fraction of proxy pixels that must change
+DEFAULT_MIN_DWELL = 1.0  # seconds a new slide must stay on screen
+ANALYSIS_WIDTH = 160  # pixels; width of the grayscale proxy frames are scored on
+SETTLE_THRESHOLD = 0.001  # fraction of proxy pixels that may still change on a settled slide
+SETTLE_MAX_SECONDS = 5.0  # stop waiting for a slide to settle after this long
+FFMPEG_BIN = "ffmpeg"
+FFMPEG_READ_AHEAD_FRAMES = 8  # a forward seek closer than this reads on through the pipe instead of restarting ffmpeg
+DEFAULT_WRITER_THREADS = 4  # background encode/write threads per decoder
+DEFAULT_OCR_THREADS = os.cpu_count() or 1  # concurrent tesseract runs when pipelining, shared by all decoders
+OCR_ENGINES = ("cli", "tesserocr")
+TESSERACT_PAGE_SEPARATOR = "\f"  # tesseract's default page_separator
+TESSERACT_PSM = 3  # page segmentation mode: fully automatic, tesseract's default
+TESSERACT_OEM = 3  # OCR engine mode: whatever is available, tesseract's default
+TESSERACT_VARIABLES: dict[str, str] = {}  # ``-c name=value`` overrides for every run
+SLIDES_INDEX_SUFFIX = "_slides.index.json"  # sidecar of <stem>_slides.txt for incremental OCR
+DEFAULT_OCR_CACHE = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "video_ocr" / "ocr_cache.sqlite3"
+DEFAULT_OCR_CACHE_SIZE = 256 * 2**20  # bytes of cached text before the least recently used entries go
+CALIBRATION_SECONDS = 5.0  # media seconds decoded per candidate when auto-tuning thread counts
+SLIDE_DETECT_WIDTH = 640  # pixels; slide outline detection runs at this width
+SLIDE_MIN_AREA = 0.15  # a detected slide must cover at least this fraction of the frame
+SLIDE_FULL_AREA = 0.95  # a quad covering this fraction of the frame is the frame itself: nothing to crop
+SLIDE_MIN_CONTRAST = 40  # grey levels between a slide's mean brightness and its surroundings'
+SLIDE_MAX_OUTSIDE_EDGES = 0.002  # fraction of loose edge pixels (text) around a slide above which the frame is left whole
+SLIDE_TILE_AREA = 0.01  # boxes around a slide at least this large (speaker tiles) are not counted as slide content
+SCENE_CHANGE_THRESHOLD = 0.3  # fraction of proxy pixels changed before the slide is searched again
+HASH_SIZE = 16  # perceptual hash is HASH_SIZE² bits
+DEDUPE_WIDTH = 640  # pixels; hash matches are confirmed on a grayscale copy this wide, where text stays legible
+DEDUPE_MAX_CHANGE = 0.0001  # fraction of DEDUPE_WIDTH pixels that may differ (beyond noise) between duplicates
+PIXEL_NOISE = 24  # grey levels a proxy pixel may drift (compression noise) without counting as changed
+SIZE_UNITS = {"": 1, "K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+
+_FFMPEG_VERSION_RE = re.compile(r"ffmpeg version n?(\d+)\.(\d+)")
+_SHOWINFO_RE = re.compile(r"\bn:\s*\d+\s+pts:\s*\S+\s+pts_time:(?P<pts>\S+).*?\bs:(?P<w>\d+)x(?P<h>\d+)")
 
 def list_video_files(directory = Path(".")) -> List[Path]:
     """Return every video file (by known extension) in *directory*, sorted alphabetically."""
     return sorted(p for p in directory.iterdir() if p.is_file() and p.suffix.lower() in VIDEO_EXTENSIONS)
 
-def extract_snapshots(video_path: Path, interval_seconds: int = DEFAULT_INTERVAL) -> Path:
-    """Extract a frame every *interval_seconds* seconds from *video_path*.
+class Decoder(Protocol):
+    """The subset of the ``cv2.VideoCapture`` API the samplers rely on.
 
-    Snapshots are stored as JPEGs inside ``<video_stem>_snapshots`` sitting next to the video.
-    The directory path is returned.
+    ``cv2.VideoCapture`` is the ``"opencv"`` backend as-is; :class:`FFmpegDecoder` is the
+    ``"ffmpeg"`` one.  ``get``/``set`` must understand ``CAP_PROP_POS_MSEC`` (timestamp of the
+    frame last grabbed / seek target), ``CAP_PROP_POS_FRAMES`` (seek target), ``CAP_PROP_FPS`` and
+    ``CAP_PROP_FRAME_COUNT``.  ``retrieve`` decodes into *image* when it is given and has the
+    right shape, like OpenCV's output arrays, so a scan loop can reuse one buffer.  A backend
+    whose seeks always deliver the first frame at or after the target sets ``seeks_exactly``
+    (OpenCV's do not, see :func:`_seek`).
     """
-    video_path = video_path.expanduser().resolve()
-    if not video_path.exists():
-        raise FileNotFoundError(video_path)
+    def isOpened(self) -> bool: ...
+    def grab(self) -> bool: ...
+    def retrieve(self, image: Any = None) -> tuple[bool, Any]: ...
+    def read(self) -> tuple[bool, Any]: ...
+    def get(self, prop: int) -> float: ...
+    def set(self, prop: int, value: float) -> bool: ...
+    def release(self) -> None: ...
 
-    out_dir = video_path.parent / f"{video_path.stem}_snapshots"
-    out_dir.mkdir(exist_ok=True)
+@functools.cache
+def _ffmpeg_passthrough_args() -> List[str]:
+    """Output flags that pass frame timestamps through untouched: ``-fps_mode`` from ffmpeg 5.1,
+    ``-vsync`` before it.  Builds without a release number (git snapshots) get ``-fps_mode``."""
+    try:
+        banner = subprocess.run([FFMPEG_BIN, "-version"], capture_output=True, text=True).stdout
+    except OSError:
+        banner = ""
+    m = _FFMPEG_VERSION_RE.match(banner)
+    return ["-vsync", "passthrough"] if m and (int(m[1]), int(m[2])) < (5, 1) else ["-fps_mode", "passthrough"]
+
+class FFmpegDecoder:
+    """Decoder backend that runs ``ffmpeg`` as a subprocess and reads raw frames from a pipe.
+
+    Unlike OpenCV, ffmpeg can be told to do work before frames ever reach Python: decode only
+    keyframes (*keyframes_only*, ``-skip_frame nokey``), drop frames down to *fps* per second,
+    scale to *width* pixels wide and emit single-channel frames (*gray*).  Presentation timestamps
+    come from a ``showinfo`` filter on stderr, read by a helper thread.  A seek at most
+    FFMPEG_READ_AHEAD_FRAMES frames ahead (seconds with *keyframes_only*, where the pipe only
+    carries keyframes) reads on through the running pipe; any other seek restarts ffmpeg with an
+    input ``-ss``.  Either way, with ``-copyts`` the next frame delivered is the first one at or
+    after the target (:attr:`seeks_exactly`) and timestamps stay on the original timeline.  *threads* is
+    passed to the decoder as ``-threads`` (ffmpeg picks a count itself otherwise).
+    """
+    seeks_exactly = True
+
+    def __init__(self, video_path: Path, *, keyframes_only: bool = False, fps: float | None = None,
+                 width: int | None = None, gray: bool = False, threads: int | None = None) -> None:
+        self._path, self._threads = video_path, threads
+        probe = cv2.VideoCapture(str(video_path))  # container metadata only
+        self._fps = probe.get(cv2.CAP_PROP_FPS) if probe.isOpened() else 0.0
+        self._frames = probe.get(cv2.CAP_PROP_FRAME_COUNT) if probe.isOpened() else 0.0
+        probe.release()
+        if fps:  # what the pipe delivers after the fps filter
+            self._frames = self._frames * fps / self._fps if self._fps > 0 else 0.0
+            self._fps = fps
+        self._keyframes_only, self._gray = keyframes_only, gray
+        self._filters = [f for f in (f"fps={fps}" if fps else "", f"scale={width}:-2" if width else "") if f]
+        self._opened = shutil.which(FFMPEG_BIN) is not None and video_path.is_file()
+        self._proc: subprocess.Popen | None = None
+        self._pos_ms = 0.0
+        self._ahead_of = 0.0  # every frame at or after this time is still to come from the pipe
+        self._pending = False  # the buffered frame was read while seeking and not delivered yet
+        self._buf: bytearray | None = None
+        self._shape: tuple[int, ...] | None = None
+        self._start(0.0)
+
+    def _start(self, start_ms: float) -> None:
+        self.release()
+        self._ahead_of, self._pending = start_ms, False
+        if not self._opened:
+            return
+        cmd = [FFMPEG_BIN, "-hide_banner", "-nostdin", "-loglevel", "info"]
+        if self._keyframes_only:
+            cmd += ["-skip_frame", "nokey"]
+        if self._threads is not None:
+            cmd += ["-threads", str(self._threads)]
+        cmd += ["-copyts", "-ss", f"{start_ms / 1000:.3f}", "-i", str(self._path), "-an", "-sn", "-dn",
+                "-vf", ",".join(self._filters + ["showinfo=checksum=0"]), *_ffmpeg_passthrough_args(),
+                "-f", "rawvideo", "-pix_fmt", "gray" if self._gray else "bgr24", "-"]
+        self._proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._info: queue.Queue = queue.Queue()
+        self._log: List[str] = []
+        threading.Thread(target=self._read_stderr, args=(self._proc, self._info, self._log), daemon=True).start()
+    @staticmethod
+    def _read_stderr(proc: subprocess.Popen, info: queue.Queue, log: List[str]) -> None:
+        for raw in proc.stderr:  # type: ignore[union-attr]
+            line = raw.decode("utf-8", "replace")
+            m = _SHOWINFO_RE.search(line)
+            if m:
+                info.put((float(m["pts"]) * 1000.0, int(m["w"]), int(m["h"])))
+            else:
+                log[:] = (log + [line.rstrip()])[-20:]
+        proc.stderr.close()  # type: ignore[union-attr]
+        info.put(None)
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def grab(self) -> bool:
+        if self._proc is None:
+            return False
+        if self._pending:
+            self._pending, self._ahead_of = False, math.nextafter(self._pos_ms, math.inf)
+            return True
+        meta = self._info.get()
+        if meta is None:  # ffmpeg exited: end of stream, or a failure worth reporting
+            failed = self._proc.wait() != 0
+            self.release()  # later grabs see the end too; a seek restarts ffmpeg
+            if failed:
+                raise RuntimeError(f"ffmpeg failed on {self._path}: " + " | ".join(self._log[-3:]))
+            return False
+        self._pos_ms, w, h = meta
+        self._ahead_of = math.nextafter(self._pos_ms, math.inf)
+        shape = (h, w) if self._gray else (h, w, 3)
+        if self._shape != shape:
+            self._shape, self._buf = shape, bytearray(math.prod(shape))
+        view, got = memoryview(self._buf), 0  # type: ignore[arg-type]
+        while got < len(view):
+            n = self._proc.stdout.readinto(view[got:])  # type: ignore[union-attr]
+            if not n:
+                return False
+            got += n
+        return True
+
+    def retrieve(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        if self._buf is None:
+            return False, None
+        frame = np.frombuffer(self._buf, np.uint8).reshape(self._shape)
+        if image is None or image.shape != frame.shape:
+            return True, frame.copy()
+        np.copyto(image, frame)
+        return True, image
+
+    def read(self) -> tuple[bool, np.ndarray | None]:
+        return self.retrieve() if self.grab() else (False, None)
 
-    cap = cv2.VideoCapture(str(video_path))
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self._pos_ms
+        if prop == cv2.CAP_PROP_FPS:
+            return self._fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return self._frames
+        return 0.0
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop == cv2.CAP_PROP_POS_FRAMES and self._fps > 0:
+            prop, value = cv2.CAP_PROP_POS_MSEC, value * 1000.0 / self._fps
+        if prop != cv2.CAP_PROP_POS_MSEC or not self._opened:
+            return False
+        ahead = (value - self._ahead_of) / 1000.0 * (1.0 if self._keyframes_only else self._fps)
+        if self._proc is None or not 0 <= ahead <= FFMPEG_READ_AHEAD_FRAMES or not self._read_to(value):
+            self._start(value)
+        return True
+
+    def _read_to(self, target_ms: float) -> bool:
+        """Read frames off the running pipe until one at or after *target_ms* is buffered for
+        the next :meth:`grab`; False at the end of the stream."""
+        while not (self._pending and self._pos_ms >= target_ms):
+            self._pending = False
+            if not self.grab():
+                return False
+            self._pending = True
+        self._ahead_of = target_ms
+        return True
+
+    def release(self) -> None:
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+            self._proc.stdout.close()  # type: ignore[union-attr]  # stderr is closed by its reader thread
+            self._proc = None
+
+def _check_decoder(decoder: str, ffmpeg_options: dict) -> None:
+    if decoder not in DECODERS:
+        raise ValueError(f"Unknown decoder {decoder!r}; expected one of {DECODERS}")
+    if decoder == "opencv" and any(ffmpeg_options.values()):
+        raise ValueError(f"Options {sorted(k for k, v in ffmpeg_options.items() if v)} need the ffmpeg decoder")
+
+def _decoder_settings(decoder: str | None = None, keyframes_only: bool = False, decoder_fps: float | None = None,
+                      decoder_width: int | None = None, decoder_gray: bool = False) -> tuple[str, dict]:
+    """Backend name and :class:`FFmpegDecoder` options for the extraction arguments: ffmpeg
+    unless *decoder* says otherwise as soon as an ffmpeg-only option is set."""
+    decoder_options = dict(keyframes_only=keyframes_only, fps=decoder_fps, width=decoder_width, gray=decoder_gray)
+    decoder = decoder or ("ffmpeg" if any(decoder_options.values()) else "opencv")
+    _check_decoder(decoder, decoder_options)
+    return decoder, decoder_options
+
+def _open_decoder(video_path: Path, decoder: str = "opencv", threads: int | None = None, **ffmpeg_options) -> Decoder:
+    """Open *video_path* with the named backend; *ffmpeg_options* go to :class:`FFmpegDecoder`.
+    *threads* sets the codec's decoding threads (None: the backend's default)."""
+    _check_decoder(decoder, ffmpeg_options)
+    if decoder == "ffmpeg":
+        cap: Decoder = FFmpegDecoder(video_path, threads=threads, **ffmpeg_options)
+    elif threads is not None:
+        cap = cv2.VideoCapture(str(video_path), cv2.CAP_ANY, [cv2.CAP_PROP_N_THREADS, threads])
+    else:
+        cap = cv2.VideoCapture(str(video_path))
     if not cap.isOpened():
-        raise RuntimeError(f"Unable to open {video_path}")
+        hint = f" (is {FFMPEG_BIN} on PATH?)" if decoder == "ffmpeg" else ""
+        raise RuntimeError(f"Unable to open {video_path}{hint}")
+    return cap
+
+def _frame_time(cap: Decoder, prev_ms: float, fps: float) -> float:
+    """Presentation time (ms) of the frame just grabbed from *cap*.
+
+    Some demuxers never fill in timestamps; if the reported time fails to advance we step
+    forward by one nominal frame duration so the timeline stays monotonic.
+    """
+    pos = cap.get(cv2.CAP_PROP_POS_MSEC)
+    return pos if pos > prev_ms else prev_ms + 1000.0 / fps
+
+def _first_target(start_ms: float, interval_ms: float) -> float:
+    """Smallest multiple of *interval_ms* that is not before *start_ms*."""
+    return -(-start_ms // interval_ms) * interval_ms
+
+def _sample_linear(cap: Decoder, interval_seconds: float, start_ms: float = 0.0, end_ms: float = float("inf")) -> Iterator[tuple[float, np.ndarray]]:
+    """Walk the stream and yield ``(time_ms, frame)`` for the first frame at or after each
+    multiple of *interval_seconds* within ``[start_ms, end_ms)``.
+
+    Targets are matched against presentation timestamps rather than frame counts, so the cadence
+    holds on variable-frame-rate recordings.  Frames in between are only ``grab()``-ed (demuxed and
+    decoded) and never converted to BGR; ``retrieve()`` is paid for snapshot frames alone.  Every
+    frame is decoded into the same buffer, so a yielded frame is only valid until the next one is
+    requested; callers copy what they keep.
+    """
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0  # Only used when the stream lacks timestamps
+    interval_ms = interval_seconds * 1000.0
+
+    target_ms = _first_target(start_ms, interval_ms)
+    pos, frame = -1.0, None
+    grabbed = _seek(cap, start_ms, fps) if start_ms > 0 else cap.grab()
+    while grabbed:
+        pos = _frame_time(cap, pos, fps)
+        if pos >= end_ms:
+            break
+        if pos + 1.0 >= target_ms:  # container timestamps are rounded to the millisecond
+            ok, frame = cap.retrieve(frame)
+            if not ok:
+                break
+            yield pos, frame
+            target_ms = max(target_ms + interval_ms, (pos // interval_ms + 1) * interval_ms)
+        grabbed = cap.grab()
+
+def _seek(cap: Decoder, target_ms: float, fps: float) -> bool:
+    """Position *cap* on the first frame at or after *target_ms* and grab it.
+
+    Seeks by timestamp first, then by frame index.  Containers with sparse or broken indexes
+    often land on the preceding keyframe instead, so we grab forward from wherever the seek
+    left us until the target time is reached.  OpenCV converts a seek time to a frame index
+    with the nominal *fps*, so on a variable-frame-rate stream it can also land far past the
+    target; then we seek again further and further back (doubling the distance) until the
+    landing is not after the target, and grab forward from there.  Backends that set
+    ``seeks_exactly`` skip both corrections.  Returns ``False`` once the target lies beyond the
+    end of the stream.
+    """
+    slack = 1.0  # container timestamps are rounded to the millisecond
+    frame_ms = 1000.0 / fps if fps > 0 else 40.0
+    for prop, at in ((cv2.CAP_PROP_POS_MSEC, lambda ms: ms), (cv2.CAP_PROP_POS_FRAMES, lambda ms: round(ms * fps / 1000))):
+        if cap.set(prop, at(target_ms)) and cap.grab():
+            if getattr(cap, "seeks_exactly", False):
+                return True
+            pos = cap.get(cv2.CAP_PROP_POS_MSEC)
+            back = max(pos - target_ms, frame_ms)
+            while pos > target_ms + frame_ms:  # Landed late (VFR): the first frame may lie earlier
+                earlier = max(target_ms - back, 0.0)
+                if not (cap.set(prop, at(earlier)) and cap.grab()):
+                    return False
+                pos = cap.get(cv2.CAP_PROP_POS_MSEC)
+                if earlier == 0.0:
+                    break  # the stream starts after the target
+                back *= 2
+            while pos + slack < target_ms:  # Landed on an earlier keyframe: decode forward
+                if not cap.grab():
+                    return False
+                pos = cap.get(cv2.CAP_PROP_POS_MSEC)
+            return True
+    return False
+
+def _sample_seek(cap: Decoder, interval_seconds: float, start_ms: float = 0.0, end_ms: float = float("inf")) -> Iterator[tuple[float, np.ndarray]]:
+    """Jump straight to each snapshot time in ``[start_ms, end_ms)`` so the cost scales with the
+    number of snapshots.
+
+    Yields ``(time_ms, frame)`` with the time reported by the decoder for the first frame at or
+    after each target (see :func:`_seek`), which may be later than the target itself.  As with
+    :func:`_sample_linear` the frame buffer is reused between yields.
+    """
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0  # Nominal rate, only used for the frame-index fallback
+    interval_ms = interval_seconds * 1000.0
+
+    target_ms = _first_target(start_ms, interval_ms)
+    last_pos, frame = -1.0, None
+    while target_ms < end_ms and _seek(cap, target_ms, fps):
+        pos = cap.get(cv2.CAP_PROP_POS_MSEC)
+        if pos >= end_ms:
+            break  # the landed frame belongs to the next range
+        if pos <= last_pos:
+            break  # seeking no longer makes progress (truncated or unseekable tail)
+        ok, frame = cap.retrieve(frame)
+        if not ok:
+            break
+        yield pos, frame
+        last_pos = pos
+        target_ms = max(target_ms + interval_ms, (pos // interval_ms + 1) * interval_ms)
+
+def _write_manifest(out_dir: Path, entries: List[dict], **info) -> None:
+    """Record per-snapshot metadata (file name, media time, hash, covered ranges) next to the
+    snapshots; *info* adds run-level fields such as the encoding used."""
+    (out_dir / MANIFEST_NAME).write_text(json.dumps({**info, "snapshots": entries}, indent=1), encoding="utf-8")
+
+def _read_manifest(snapshot_dir: Path) -> dict:
+    """The manifest written by :func:`_write_manifest`, or an empty one if absent or unreadable."""
+    try:
+        return json.loads((snapshot_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def _snapshot_encoding(snapshot_format: str = "jpeg", jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+                       png_compression: int = DEFAULT_PNG_COMPRESSION, gray: bool = False) -> dict:
+    return {"format": snapshot_format, "jpeg_quality": jpeg_quality, "png_compression": png_compression, "gray": gray}
+
+def _analysis_proxy(frame: np.ndarray, width: int = ANALYSIS_WIDTH) -> np.ndarray:
+    """Small grayscale copy of *frame*, *width* pixels wide, used for scoring; noise and fine
+    detail average out."""
+    h, w = frame.shape[:2]
+    size = (width, max(1, round(h * width / w)))
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+def _change_score(a: np.ndarray, b: np.ndarray) -> float:
+    """Fraction of proxy pixels whose brightness moved by more than compression noise.  Proxies
+    of different shapes (a cut between a cropped slide and an uncropped scene) score 1.0."""
+    if a.shape != b.shape:
+        return 1.0
+    return float(np.count_nonzero(np.abs(a.astype(np.int16) - b) > PIXEL_NOISE) / a.size)
+
+def _detect_changes(samples: Iterator[tuple[float, np.ndarray, np.ndarray]], threshold: float, min_dwell_seconds: float,
+                    emit_from_ms: float = 0.0) -> Iterator[tuple[float, np.ndarray, np.ndarray]]:
+    """Keep only the samples where the on-screen slide changes.
+
+    Consecutive samples are scored against each other; a score above *threshold* starts a new
+    candidate slide.  The candidate is emitted once it has stayed on screen for
+    *min_dwell_seconds* without another change, and only if it differs from the previously
+    emitted slide (so a flicker A→B→A yields nothing).  Samples before *emit_from_ms* only seed
+    the comparison state, which lets a timeline segment pick up where the previous one ended.
+    Samples are ``(time_ms, frame, proxy)`` triples; only proxies are compared and kept, plus a
+    full-resolution copy of the one pending candidate.
+    """
+    min_dwell_ms = min_dwell_seconds * 1000.0
+    last_emitted: np.ndarray | None = None
+    prev: np.ndarray | None = None
+    pending: tuple[float, np.ndarray, np.ndarray] | None = None
+
+    for time_ms, frame, proxy in samples:
+        if time_ms < emit_from_ms:
+            prev = last_emitted = proxy
+            continue
+        if prev is None or _change_score(prev, proxy) > threshold:
+            pending = (time_ms, frame.copy(), proxy)
+        prev = proxy
+        if pending is not None and time_ms - pending[0] >= min_dwell_ms:
+            if last_emitted is None or _change_score(last_emitted, pending[2]) > threshold:
+                yield pending
+                last_emitted = pending[2]
+            pending = None
+
+    # The stream (or this segment) ended before the dwell elapsed: keep the last slide anyway
+    if pending is not None and (last_emitted is None or _change_score(last_emitted, pending[2]) > threshold):
+        yield pending
+
+def _order_corners(pts: np.ndarray) -> np.ndarray:
+    """Order four points top-left, top-right, bottom-right, bottom-left."""
+    pts = pts.reshape(4, 2).astype(np.float32)
+    s, d = pts.sum(axis=1), np.diff(pts, axis=1).ravel()
+    return np.array([pts[np.argmin(s)], pts[np.argmin(d)], pts[np.argmax(s)], pts[np.argmax(d)]], np.float32)
+
+def _find_slide_quad(frame: np.ndarray) -> np.ndarray | None:
+    """Corners of the slide inside *frame*, or ``None`` when no plausible one is found.
+
+    Looks for the largest convex quadrilateral covering at least SLIDE_MIN_AREA of the frame,
+    first among bright regions (a lit screen in a darker room), then among edge contours (a
+    slide pane has crisp borders).  A quad is only taken for the slide when it stands out from
+    its surroundings (see :func:`_quad_stands_out`), so a boxed table or figure on a full-screen
+    slide is not; and a slide that already fills the frame (SLIDE_FULL_AREA) yields ``None``.
+    Works on a SLIDE_DETECT_WIDTH-wide copy and returns corners in full-resolution pixels,
+    ordered as :func:`_order_corners`.
+    """
+    h, w = frame.shape[:2]
+    scale = min(1.0, SLIDE_DETECT_WIDTH / w)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.GaussianBlur(cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA), (5, 5), 0)
+    frame_area = small.shape[0] * small.shape[1]
+
+    canny = cv2.Canny(small, 50, 150)
+    edges = cv2.dilate(canny, np.ones((3, 3), np.uint8))
+    bright = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+    boxes = _box_mask(edges, frame_area)
+    for mask in (bright, edges):
+        contours = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[0]
+        for contour in sorted(contours, key=cv2.contourArea, reverse=True):
+            area = cv2.contourArea(contour)
+            if area < SLIDE_MIN_AREA * frame_area:
+                break
+            approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+            if len(approx) != 4 or not cv2.isContourConvex(approx):
+                continue
+            if area >= SLIDE_FULL_AREA * frame_area:
+                return None
+            if _quad_stands_out(small, canny, boxes, approx):
+                return _order_corners(approx) / scale
+    return None
+
+def _box_mask(edges: np.ndarray, frame_area: float) -> np.ndarray:
+    """Mask of the filled boxes (closed, nearly rectangular outlines of at least SLIDE_TILE_AREA)
+    in the dilated edge map *edges*: speaker tiles, thumbnails and the slide itself."""
+    boxes = np.zeros(edges.shape, np.uint8)
+    for contour in cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[0]:
+        area = cv2.contourArea(contour)
+        x, y, w, h = cv2.boundingRect(contour)
+        if area >= SLIDE_TILE_AREA * frame_area and area >= 0.9 * w * h:
+            cv2.drawContours(boxes, [contour], -1, 255, cv2.FILLED)
+    return boxes
+
+def _quad_stands_out(gray: np.ndarray, edges: np.ndarray, boxes: np.ndarray, quad: np.ndarray) -> bool:
+    """Whether *quad* in *gray* looks like a slide against its surroundings rather than a box
+    on one.  Its mean brightness must differ from the rest of the frame by SLIDE_MIN_CONTRAST
+    grey levels, and the surroundings must hold no content of their own: at most
+    SLIDE_MAX_OUTSIDE_EDGES of the pixels around it may be *edges*, not counting those inside
+    other *boxes* (speaker tiles).  A title or text next to the box means it is part of a slide.
+    """
+    inside = np.zeros(gray.shape, np.uint8)
+    cv2.fillConvexPoly(inside, quad.reshape(-1, 2).astype(np.int32), 255)
+    outside = cv2.dilate(inside, np.ones((7, 7), np.uint8)) == 0  # clear of the quad's own border
+    if not outside.any():
+        return True
+    if abs(float(gray[inside > 0].mean()) - float(gray[outside].mean())) < SLIDE_MIN_CONTRAST:
+        return False
+    loose = outside & (cv2.dilate(boxes, np.ones((7, 7), np.uint8)) == 0)
+    return np.count_nonzero(edges[loose]) <= SLIDE_MAX_OUTSIDE_EDGES * np.count_nonzero(outside)
+
+def _crop_to_quad(frame: np.ndarray, quad: np.ndarray, deskew: bool) -> np.ndarray:
+    """Cut *quad* out of *frame*: its bounding box, or with *deskew* a perspective-corrected
+    rectangle sized after the quad's longer edges."""
+    if not deskew:
+        x, y, w, h = cv2.boundingRect(quad.astype(np.int32))
+        return np.ascontiguousarray(frame[y:y + h, x:x + w])
+    tl, tr, br, bl = quad
+    w = int(round(max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))))
+    h = int(round(max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))))
+    target = np.array([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]], np.float32)
+    return cv2.warpPerspective(frame, cv2.getPerspectiveTransform(quad, target), (w, h), flags=cv2.INTER_LINEAR)
+
+class _SlideCropper:
+    """Callable cropping each frame to the slide, detecting the slide once per stable scene.
 
-    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0  # Fallback if FPS unavailable
-    frame_interval = int(round(fps * interval_seconds)) or 1
+    The slide rectangle is searched again only when the full frame has changed by more than
+    SCENE_CHANGE_THRESHOLD since the last detection (camera cut, layout switch); frames without
+    a detectable slide pass through unchanged.
+    """
+
+    def __init__(self, deskew: bool = False) -> None:
+        self._deskew = deskew
+        self._quad: np.ndarray | None = None
+        self._scene: np.ndarray | None = None
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        proxy = _analysis_proxy(frame)
+        if self._scene is None or _change_score(self._scene, proxy) > SCENE_CHANGE_THRESHOLD:
+            self._quad, self._scene = _find_slide_quad(frame), proxy
+        return frame if self._quad is None else _crop_to_quad(frame, self._quad, self._deskew)
+
+def _settle(cap: Decoder, time_ms: float, frame: np.ndarray, proxy: np.ndarray, settle_frames: int, end_ms: float,
+            crop: Callable[[np.ndarray], np.ndarray] | None = None) -> tuple[float, np.ndarray, np.ndarray]:
+    """Move a capture from *frame* forward to the first frame that has stopped changing.
 
-    frame_no = 0
-    shot_no = 0
-    while True:
-        ok, frame = cap.read()
+    Frames are read one by one until *settle_frames* consecutive ones differ by at most
+    SETTLE_THRESHOLD from the first frame of the run, i.e. fades and bullet builds have finished.
+    Comparing against the start of the run rather than the previous frame catches slow fades
+    whose per-frame step hides below the pixel noise floor.  Gives up after SETTLE_MAX_SECONDS
+    (continuous motion such as embedded video) and returns the latest frame read.  If the
+    sampler already moved past *frame* (change mode reports a slide after its dwell) we seek
+    back to it first, and afterwards leave the capture no earlier than we found it so the
+    sampler's timeline stays monotonic.  Frames read here go through *crop* like sampled ones
+    and are decoded into one buffer of their own; only their proxies are compared.
+    """
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    resume_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+    if resume_ms > time_ms + 1.0 and not _seek(cap, time_ms, fps):
+        return time_ms, frame, proxy
+
+    limit_ms = min(end_ms, time_ms + SETTLE_MAX_SECONDS * 1000.0)
+    anchor, pos, stable, buf = proxy, time_ms, 0, None
+    while stable < settle_frames and cap.grab():
+        pos = _frame_time(cap, pos, fps)
+        if pos >= limit_ms:
+            break
+        ok, buf = cap.retrieve(buf)
         if not ok:
-            break  # end of video
+            break
+        nxt = buf if crop is None else crop(buf)
+        nxt_proxy = _analysis_proxy(nxt)
+        if _change_score(anchor, nxt_proxy) <= SETTLE_THRESHOLD:
+            stable += 1
+        else:
+            anchor, stable = nxt_proxy, 0
+        time_ms, frame, proxy = pos, nxt, nxt_proxy
+
+    while pos + 1.0 < resume_ms and cap.grab():
+        pos = cap.get(cv2.CAP_PROP_POS_MSEC)
+    return time_ms, frame, proxy
+
+def _refine_transition(cap: Decoder, lo_ms: float, hi_ms: float, threshold: float, resolution_seconds: float,
+                       crop: Callable[[np.ndarray], np.ndarray] | None = None) -> float:
+    """Time of the first frame after *lo_ms* that differs from the frame at *lo_ms*, found by bisection.
+
+    The coarse scan saw the change somewhere in ``(lo_ms, hi_ms]``.  Each step seeks to the middle
+    of the remaining interval and keeps the half the change lies in, so the boundary is pinned
+    to within *resolution_seconds* (or to the exact frame) for about log2(interval / resolution)
+    decoded frames instead of every frame in between.  Differences are scored like change
+    detection, on proxies of *crop*-ped frames.  The capture is then sent back to where the
+    sampler left it.
+    """
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    resume_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+    resolution_ms = resolution_seconds * 1000.0
+    before: np.ndarray | None = None  # proxy of the frame at lo_ms, the content being replaced
+    upper, buf = hi_ms, None
+    while upper - lo_ms > resolution_ms:
+        mid = lo_ms if before is None else (lo_ms + upper) / 2
+        if not _seek(cap, mid, fps):
+            break
+        pos = cap.get(cv2.CAP_PROP_POS_MSEC)
+        if before is not None and pos <= lo_ms:
+            break  # the decoder cannot land any closer
+        if pos >= upper:  # no frame starts in [mid, upper)
+            if before is None:
+                break
+            upper = mid
+            continue
+        ok, buf = cap.retrieve(buf)
+        if not ok:
+            break
+        proxy = _analysis_proxy(buf if crop is None else crop(buf))
+        if before is None:
+            before, lo_ms = proxy, pos
+        elif _change_score(before, proxy) > threshold:
+            hi_ms = upper = pos
+        else:
+            lo_ms = pos
+
+    if cap.get(cv2.CAP_PROP_POS_MSEC) + 1.0 < resume_ms:
+        _seek(cap, resume_ms, fps)
+    return hi_ms
+
+def _select_frames(cap: Decoder, start_ms: float, end_ms: float, *, interval_seconds: float, sampling: str,
+                   mode: str, scan_step: float, change_threshold: float, min_dwell: float,
+                   settle_frames: int = 0, crop_slide: bool = False, deskew: bool = False,
+                   bisect_resolution: float = DEFAULT_BISECT_RESOLUTION) -> Iterator[tuple[float, np.ndarray, np.ndarray]]:
+    """Yield ``(time_ms, frame, proxy)`` for the frames in ``[start_ms, end_ms)`` that should
+    become snapshots.
+
+    All analysis runs on *proxy*, the :func:`_analysis_proxy` of the frame; scanned frames are
+    decoded into a reused buffer and dropped once their proxy is taken, so *frame* is only valid
+    until the next item is requested.  With *crop_slide* (or *deskew*) every frame is cut down to
+    the detected slide before any analysis, so change detection ignores a speaker tile or the
+    lecture hall around the screen.  In ``"bisect"`` *mode* each slide found by the change scan
+    keeps the pixels of the scan sample but gets the time of the transition, refined by
+    :func:`_refine_transition` to *bisect_resolution* seconds.
+    """
+    sampler = _sample_seek if sampling == "seek" else _sample_linear
+    crop = _SlideCropper(deskew) if crop_slide or deskew else None
+    if mode == "interval":
+        samples = sampler(cap, interval_seconds, start_ms, end_ms)
+    else:
+        # Change detection scans at *scan_step*; a later segment starts one step early to seed its state
+        samples = sampler(cap, scan_step, max(0.0, start_ms - scan_step * 1000.0), end_ms)
+    if crop is not None:
+        samples = ((time_ms, crop(frame)) for time_ms, frame in samples)
+    samples = ((time_ms, frame, _analysis_proxy(frame)) for time_ms, frame in samples)
+    if mode != "interval":
+        samples = _detect_changes(samples, change_threshold, min_dwell, emit_from_ms=start_ms)
+
+    for time_ms, frame, proxy in samples:
+        if mode == "bisect":
+            time_ms = _refine_transition(cap, max(0.0, time_ms - scan_step * 1000.0), time_ms, change_threshold, bisect_resolution, crop)
+        yield _settle(cap, time_ms, frame, proxy, settle_frames, end_ms, crop) if settle_frames > 0 else (time_ms, frame, proxy)
+
+def _dhash(frame: np.ndarray) -> int:
+    """Difference hash: signs of the horizontal gradients of a small grayscale thumbnail.
+
+    Uses HASH_SIZE² bits rather than the classic 64.  Even so, text slides that share one
+    template are only a few bits apart (a mostly white thumbnail hashes to mostly zero bits),
+    so the hash only shortlists candidates; :func:`_find_duplicate` confirms them.  Any size
+    works as input; the extractor hashes the analysis proxy.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    return int.from_bytes(np.packbits(small[:, 1:] > small[:, :-1]).tobytes(), "big")
+
+def _same_slide(a: np.ndarray, b: np.ndarray) -> bool:
+    """Whether two DEDUPE_WIDTH proxies show the same slide: at most DEDUPE_MAX_CHANGE of the
+    pixels differ by more than compression noise, once isolated pixels (codec ringing around
+    text) are removed.  One changed digit in a title is enough to tell slides apart."""
+    if a.shape != b.shape:
+        return False
+    changed = (np.abs(a.astype(np.int16) - b) > PIXEL_NOISE).astype(np.uint8)
+    changed = cv2.morphologyEx(changed, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
+    return np.count_nonzero(changed) <= DEDUPE_MAX_CHANGE * changed.size
+
+def _find_duplicate(entries: List[dict], phash: int, max_distance: int, proxy: np.ndarray | None,
+                    proxy_of: Callable[[dict], np.ndarray | None]) -> dict | None:
+    """First kept snapshot whose hash lies within *max_distance* bits of *phash* and whose
+    DEDUPE_WIDTH proxy (from *proxy_of*) shows the same slide as *proxy* (:func:`_same_slide`)."""
+    for e in entries:
+        if (int(e["hash"], 16) ^ phash).bit_count() <= max_distance:
+            other = proxy_of(e)
+            if proxy is not None and other is not None and _same_slide(proxy, other):
+                return e
+    return None
+
+def _snapshot_proxy(path: Path) -> np.ndarray | None:
+    """DEDUPE_WIDTH proxy of a snapshot file, or None if it cannot be read."""
+    image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+    return None if image is None else _analysis_proxy(image, DEDUPE_WIDTH)
+
+class _MemoryBudget:
+    """Byte count of the frames in flight between the decode loop and its consumers.
+
+    The producer :meth:`acquire`\\ s a frame's size before copying it out of the decode buffer and
+    whoever drops the last reference to the copy (snapshot writer, OCR queue) :meth:`release`\\ s
+    it, so the queues between stages are bounded by bytes, not just by count.  :meth:`acquire`
+    blocks while *limit* would be exceeded, unless no frame is in flight at all (a single frame
+    larger than the budget still goes through).  Fixed allocations such as a shared-memory ring
+    are charged with :meth:`reserve`, which never blocks and is undone with a negative size.  A
+    *limit* of None only tracks :attr:`peak`.
+    """
+
+    def __init__(self, limit: int | None = None) -> None:
+        self.limit, self.held, self.peak = limit, 0, 0
+        self._reserved = 0
+        self._cond = threading.Condition()
+
+    def _charge(self, nbytes: int) -> None:
+        self.held += nbytes
+        self.peak = max(self.peak, self.held)
+        self._cond.notify_all()
+
+    def acquire(self, nbytes: int) -> None:
+        with self._cond:
+            if self.limit is not None:
+                self._cond.wait_for(lambda: self.held == self._reserved or self.held + nbytes <= self.limit)
+            self._charge(nbytes)
+
+    def release(self, nbytes: int) -> None:
+        with self._cond:
+            self._charge(-nbytes)
+
+    def reserve(self, nbytes: int) -> None:
+        with self._cond:
+            self._reserved += nbytes
+            self._charge(nbytes)
+
+def _parse_size(text: str) -> int:
+    """``"512M"``, ``"2G"``, ``"1.5GB"`` or plain bytes → bytes (binary units)."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", text, re.IGNORECASE)
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid size {text!r}; use e.g. 512M or 2G")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+def _peak_rss() -> tuple[int, int] | None:
+    """Peak resident set size in bytes of this process and of its largest child process
+    (decoder workers, ffmpeg, tesseract), or None where :mod:`resource` is unavailable."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB elsewhere
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale)
+
+class _SnapshotWriter:
+    """Encode and write snapshots on a small thread pool so decoding never waits on disk.
+
+    ``cv2.imwrite`` releases the GIL while encoding, so the threads run truly in parallel with
+    the decode loop.  At most *max_pending* frames are queued; :meth:`submit` blocks beyond that
+    (backpressure keeps memory bounded when the disk is slow).  The first failed write is
+    re-raised from the next :meth:`submit` or from :meth:`close`, which is also the flush
+    barrier: when it returns every snapshot is on disk.  With *threads* = 0 writes happen inline.
+    *params* are ``cv2.imwrite`` encoder flags; with *gray* frames are stored single-channel.
+    Each file is encoded under a hidden ``.partial`` name and renamed into place, so a snapshot
+    name never refers to a half-written image; :attr:`written` holds the paths completed so far
+    and *on_written* is called with each one.  Submitted frames are taken to be charged to
+    *budget*, and released from it once written.
+    """
+
+    def __init__(self, threads: int = DEFAULT_WRITER_THREADS, max_pending: int | None = None, *,
+                 params: List[int] | None = None, gray: bool = False,
+                 on_written: Callable[[Path], None] | None = None, budget: _MemoryBudget | None = None) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="snapshot-writer") if threads > 0 else None
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * max(threads, 1))
+        self._error: BaseException | None = None
+        self._params, self._gray = params or [], gray
+        self.written: set[Path] = set()
+        self._on_written = on_written
+        self._budget = budget
+
+    def _write(self, path: Path, frame: np.ndarray) -> None:
+        try:
+            self._encode(path, frame)
+        finally:
+            if self._budget is not None:
+                self._budget.release(frame.nbytes)
+
+    def _encode(self, path: Path, frame: np.ndarray) -> None:
+        if self._gray and frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        partial = path.with_name(f".{path.stem}.partial{path.suffix}")  # keeps the extension imwrite encodes by
+        if not cv2.imwrite(str(partial), frame, self._params):
+            raise OSError(f"Could not write snapshot {path}")
+        os.replace(partial, path)
+        self.written.add(path)
+        if self._on_written is not None:
+            self._on_written(path)
+
+    def _done(self, future: Future, nbytes: int) -> None:
+        if future.cancelled():  # dropped by __exit__ before _write ran, so nothing released its charge
+            if self._budget is not None:
+                self._budget.release(nbytes)
+        elif future.exception() is not None and self._error is None:
+            self._error = future.exception()
+        self._slots.release()
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, path: Path, frame: np.ndarray) -> None:
+        self._raise_pending_error()
+        if self._pool is None:
+            self._write(path, frame)
+            return
+        self._slots.acquire()
+        self._pool.submit(self._write, path, frame).add_done_callback(lambda f, n=frame.nbytes: self._done(f, n))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+        self._raise_pending_error()
+
+    def __enter__(self) -> "_SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._pool is not None:  # already failing: let queued writes finish, keep the original error
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+def _imwrite_params(snapshot_format: str, jpeg_quality: int, png_compression: int) -> List[int]:
+    """``cv2.imwrite`` flags for *snapshot_format*."""
+    if snapshot_format == "jpeg":
+        return [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+    if snapshot_format == "png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+    return [cv2.IMWRITE_WEBP_QUALITY, 101]  # a quality above 100 selects lossless WebP
+
+def _check_ocr_engine(engine: str) -> None:
+    if engine not in OCR_ENGINES:
+        raise ValueError(f"Unknown OCR engine {engine!r}; expected one of {OCR_ENGINES}")
+    if engine == "tesserocr":
+        try:
+            import tesserocr  # noqa: F401
+        except ImportError:
+            raise RuntimeError("The tesserocr OCR engine needs the tesserocr package (pip install tesserocr)") from None
+
+def _tesseract_args() -> List[str]:
+    """Command-line options for the TESSERACT_PSM, TESSERACT_OEM and TESSERACT_VARIABLES every
+    OCR run uses."""
+    args = ["--psm", str(TESSERACT_PSM), "--oem", str(TESSERACT_OEM)]
+    for name, value in TESSERACT_VARIABLES.items():
+        args += ["-c", f"{name}={value}"]
+    return args
+
+def _ocr_config() -> str:
+    """The tesseract settings that shape OCR text, serialised for :class:`OcrCache` keys."""
+    return json.dumps(dict(psm=TESSERACT_PSM, oem=TESSERACT_OEM, variables=TESSERACT_VARIABLES), sort_keys=True)
+
+_tesserocr_apis = threading.local()
+
+def _tesserocr_api(lang: str) -> Any:
+    """This thread's libtesseract engine for *lang*, loaded on first use and then reused for
+    every image the thread OCRs (a ``PyTessBaseAPI`` must not be shared between threads)."""
+    apis = _tesserocr_apis.__dict__.setdefault("by_lang", {})
+    if lang not in apis:
+        import tesserocr
+        apis[lang] = tesserocr.PyTessBaseAPI(lang=lang, psm=TESSERACT_PSM, oem=TESSERACT_OEM)
+        for name, value in TESSERACT_VARIABLES.items():
+            apis[lang].SetVariable(name, value)
+    return apis[lang]
+
+def _tesserocr_text(api: Any) -> str:
+    # The CLI's text renderer ends every page with page_separator; keep the text identical
+    return api.GetUTF8Text() + TESSERACT_PAGE_SEPARATOR
+
+def _ocr_file(snap: Path, lang: str, engine: str = "cli") -> str:
+    """Tesseract text of one snapshot file, or an ``[OCR failed: …]`` marker.  *engine* is
+    ``"cli"`` (pytesseract, one tesseract process per image) or ``"tesserocr"`` (see
+    :func:`_tesserocr_api`)."""
+    try:
+        if engine == "tesserocr":
+            api = _tesserocr_api(lang)
+            api.SetImageFile(str(snap))
+            return _tesserocr_text(api)
+        # A path, not a PIL image: pytesseract would re-save that (lossily, for JPEG) first
+        return pytesseract.image_to_string(str(snap), lang=lang, config=" ".join(_tesseract_args()))
+    except Exception as e:
+        return f"[OCR failed: {e}]"
+
+def _ocr_files(snaps: List[Path], lang: str, engine: str = "cli") -> List[str]:
+    """Texts of several snapshot files, as :func:`_ocr_file` would return them one by one.
+
+    With the ``"cli"`` engine the whole chunk goes through a single tesseract run over a list
+    file, so process start-up and language loading are paid once.  The run's ``page_separator``
+    is set to a random marker that cannot occur in OCR text, the output is split on it, and
+    each page gets back the separator a single-image run ends with.  If the run fails (an
+    unreadable image aborts it) or the pages do not match the images one to one, every file is
+    OCR-ed on its own instead, so a bad snapshot still gets its own ``[OCR failed: …]`` block.
+    """
+    if engine != "cli" or len(snaps) < 2:
+        return [_ocr_file(snap, lang, engine) for snap in snaps]
+    separator = f"<video_ocr-page-{uuid.uuid4().hex}>"
+    with tempfile.TemporaryDirectory() as tmp:
+        listing = Path(tmp) / "snapshots.txt"
+        listing.write_text("".join(f"{snap.resolve()}\n" for snap in snaps), encoding="utf-8")
+        proc = subprocess.run([pytesseract.pytesseract.tesseract_cmd, str(listing), "stdout", "-l", lang, *_tesseract_args(),
+                               "-c", f"page_separator={separator}"], capture_output=True)
+    pages = proc.stdout.decode("utf-8", "replace").split(separator)
+    if pages[-1] == "":  # the separator also follows the last page
+        pages.pop()
+    if proc.returncode != 0 or len(pages) != len(snaps):
+        return [_ocr_file(snap, lang, engine) for snap in snaps]
+    return [page + TESSERACT_PAGE_SEPARATOR for page in pages]
 
-        if frame_no % frame_interval == 0:
-            snap_path = out_dir / SNAP_NAME_TEMPLATE.format(idx=shot_no)
-            cv2.imwrite(str(snap_path), frame)
-            shot_no += 1
-        frame_no += 1
+def _ocr_array(frame: np.ndarray, lang: str, engine: str = "cli") -> str:
+    """Tesseract text of an in-memory frame, or an ``[OCR failed: …]`` marker.
 
+    With the ``"cli"`` *engine* the frame is piped to the tesseract binary's stdin as
+    uncompressed PNM, a short header in front of the raw pixels, so no image file is written or
+    compressed on the way; ``"tesserocr"`` hands the pixels to the thread's loaded engine.
+    """
+    try:
+        if engine == "tesserocr":
+            api = _tesserocr_api(lang)
+            pixels = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            channels = 1 if pixels.ndim == 2 else 3
+            api.SetImageBytes(pixels.tobytes(), pixels.shape[1], pixels.shape[0], channels, pixels.shape[1] * channels)
+            return _tesserocr_text(api)
+        ok, pnm = cv2.imencode(".pgm" if frame.ndim == 2 else ".ppm", frame)
+        if not ok:
+            raise ValueError(f"cannot encode a {frame.shape} frame")
+        proc = subprocess.run([pytesseract.pytesseract.tesseract_cmd, "stdin", "stdout", "-l", lang, *_tesseract_args()],
+                              input=memoryview(pnm).cast("B"), capture_output=True)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.decode("utf-8", "replace").strip())
+        return proc.stdout.decode("utf-8")
+    except Exception as e:
+        return f"[OCR failed: {e}]"
+
+def _write_slides_text(video_path: Path, texts: Iterable[tuple[str, str]]) -> Path:
+    """Write ``<video_stem>_slides.txt`` from ``(snapshot name, text)`` pairs in snapshot order."""
+    ocr_lines = [f"# Snapshot {idx} — {name}\n{text}\n" for idx, (name, text) in enumerate(texts)]
+    out_txt = video_path.with_name(f"{video_path.stem}_slides.txt")
+    out_txt.write_text("\n".join(ocr_lines), encoding="utf-8")
+    return out_txt
+
+class _OcrWorkers:
+    """OCR snapshot files on a thread pool as soon as they are written.
+
+    pytesseract runs the tesseract binary in a subprocess, so plain threads keep *threads*
+    tesseract processes busy.  Those already fill the cores, so each tesseract runs on one OpenMP
+    thread (see :func:`_single_threaded_tesseract`) until :meth:`close`.  At most *max_pending*
+    images wait for a thread; :meth:`submit` blocks beyond that, which stalls the snapshot writer
+    and, through its own bound, the decoder.  :meth:`submit_frame` queues an in-memory frame
+    instead of a file; such frames are taken to be charged to *budget* and released from it once
+    OCR-ed.  Texts are collected in :attr:`texts` by snapshot name; :meth:`close` waits for all of
+    them.
+    """
+
+    def __init__(self, lang: str = "eng", threads: int = DEFAULT_OCR_THREADS, max_pending: int | None = None,
+                 budget: _MemoryBudget | None = None, engine: str = "cli") -> None:
+        self._lang, self._budget, self._engine = lang, budget, engine
+        self._omp_limit = os.environ.get("OMP_THREAD_LIMIT")  # restored by close()
+        _single_threaded_tesseract()
+        self._pool = ThreadPoolExecutor(max_workers=max(threads, 1), thread_name_prefix="ocr")
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * max(threads, 1))
+        self.texts: dict[str, str] = {}
+
+    def _run(self, name: str, image: Path | np.ndarray) -> None:
+        try:
+            ocr = _ocr_file if isinstance(image, Path) else _ocr_array
+            self.texts[name] = ocr(image, self._lang, self._engine)  # type: ignore[arg-type]
+        finally:
+            self._slots.release()
+            if self._budget is not None and not isinstance(image, Path):
+                self._budget.release(image.nbytes)
+
+    def submit(self, path: Path) -> None:
+        self._slots.acquire()
+        self._pool.submit(self._run, path.name, path)
+
+    def submit_frame(self, name: str, frame: np.ndarray) -> None:
+        self._slots.acquire()
+        self._pool.submit(self._run, name, frame)
+
+    def close(self, cancel: bool = False) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=cancel)
+        if self._omp_limit is None:
+            os.environ.pop("OMP_THREAD_LIMIT", None)
+
+def _ocr_ring_worker(shm: shared_memory.SharedMemory, slot_bytes: int, lang: str, engine: str,
+                     tasks: multiprocessing.Queue, free: multiprocessing.Queue, results: multiprocessing.Queue) -> None:
+    """OCR worker process for :class:`_OcrProcesses`: ``(name, slot, shape, frame)`` tasks in,
+    ``(name, text)`` out.  *frame* is only set for frames too large for a slot."""
+    _single_threaded_tesseract()
+    while (task := tasks.get()) is not None:
+        name, slot, shape, frame = task
+        if frame is None:
+            frame = np.ndarray(shape, np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+            text = _ocr_array(frame, lang, engine)
+            del frame  # drop the view before the slot is reused
+            free.put(slot)
+        else:
+            text = _ocr_array(frame, lang, engine)
+        results.put((name, text))
+
+class _FrameRing:
+    """*slots* fixed-size frame slots of *slot_bytes* in one shared-memory block.
+
+    Only slot indices and frame shapes cross process boundaries, never pixels: the producer
+    copies a frame into a slot, a consumer reads it in place and hands the index back through
+    :attr:`free`.  :meth:`put` blocks while every slot is in use, which is the backpressure;
+    while waiting it polls *alive* so a dead consumer raises instead of hanging.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int, ctx: Any = multiprocessing) -> None:
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self.free: multiprocessing.Queue = ctx.Queue()
+        for slot in range(slots):
+            self.free.put(slot)
+
+    def put(self, frame: np.ndarray, alive: Callable[[], bool]) -> int:
+        while True:
+            try:
+                slot = self.free.get(timeout=0.5)
+                break
+            except queue.Empty:
+                if not alive():
+                    raise RuntimeError("OCR worker process died") from None
+        view = np.ndarray(frame.shape, np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+        np.copyto(view, frame)
+        del view
+        return slot
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+class _OcrProcesses:
+    """In-memory OCR in *processes* worker processes fed through a :class:`_FrameRing`.
+
+    Drop-in for :class:`_OcrWorkers` with frames only (:meth:`submit_frame`).  Pickling a 6 MB
+    frame through a queue costs more than the queue itself, so each frame is copied once into a
+    shared-memory slot and workers read it from there.  The ring has two slots per process
+    (:meth:`submit_frame` blocks while all are busy) and is sized on the first frame, or
+    *slot_bytes* if larger; a larger frame later on (a deskewed slide can outgrow the video)
+    is pickled instead.  Like :class:`_OcrWorkers`, each process runs tesseract on one OpenMP
+    thread.  If a worker dies, the next call raises and :meth:`close` tears
+    everything down, shared memory included.  With a *budget*, the whole ring is charged to it
+    while it exists and each submitted frame is released as soon as it has been copied in.
+    """
+
+    def __init__(self, lang: str = "eng", processes: int = 1, slot_bytes: int = 0,
+                 budget: _MemoryBudget | None = None, engine: str = "cli") -> None:
+        self._lang, self._processes, self._slot_bytes, self._engine = lang, max(processes, 1), slot_bytes, engine
+        self._budget = budget
+        self._ring: _FrameRing | None = None
+        self._procs: List[multiprocessing.Process] = []
+        self._submitted = 0
+        self.texts: dict[str, str] = {}
+
+    def _start(self, slot_bytes: int) -> None:
+        ctx = multiprocessing.get_context()
+        self._ring = _FrameRing(2 * self._processes, slot_bytes, ctx)
+        if self._budget is not None:
+            self._budget.reserve(self._ring.shm.size)
+        self._tasks: multiprocessing.Queue = ctx.Queue()
+        self._results: multiprocessing.Queue = ctx.Queue()
+        self._procs = [ctx.Process(target=_ocr_ring_worker, daemon=True, name=f"ocr-{i}",
+                                   args=(self._ring.shm, slot_bytes, self._lang, self._engine, self._tasks, self._ring.free, self._results))
+                       for i in range(self._processes)]
+        for proc in self._procs:
+            proc.start()
+
+    def _alive(self) -> bool:
+        return all(proc.exitcode in (None, 0) for proc in self._procs)  # 0: finished after its sentinel
+
+    def submit_frame(self, name: str, frame: np.ndarray) -> None:
+        if self._ring is None:
+            self._start(max(frame.nbytes, self._slot_bytes))
+        assert self._ring is not None
+        if not self._alive():
+            raise RuntimeError("OCR worker process died")
+        try:
+            if frame.nbytes <= self._ring.slot_bytes:
+                self._tasks.put((name, self._ring.put(frame, self._alive), frame.shape, None))
+            else:
+                self._tasks.put((name, -1, frame.shape, frame))
+        finally:
+            if self._budget is not None:
+                self._budget.release(frame.nbytes)
+        self._submitted += 1
+
+    def close(self, cancel: bool = False) -> None:
+        try:
+            if not cancel and self._ring is not None:
+                for _ in self._procs:
+                    self._tasks.put(None)
+                while len(self.texts) < self._submitted:
+                    try:
+                        name, text = self._results.get(timeout=0.5)
+                        self.texts[name] = text
+                    except queue.Empty:
+                        if not self._alive():
+                            raise RuntimeError("OCR worker process died") from None
+                for proc in self._procs:
+                    proc.join()
+        finally:
+            for proc in self._procs:
+                if proc.is_alive():
+                    proc.terminate()
+                proc.join()
+            if self._ring is not None:
+                if self._budget is not None:
+                    self._budget.reserve(-self._ring.shm.size)
+                self._ring.close()
+                self._ring = None
+
+def _image_complete(path: Path) -> bool:
+    """Whether *path* holds a whole image: ending in the JPEG or PNG trailer, or for WebP as long
+    as its RIFF header says.  Cheap enough to run over every snapshot when resuming."""
+    try:
+        with path.open("rb") as f:
+            head = f.read(12)
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - 12))
+            tail = f.read()
+    except OSError:
+        return False
+    if head[:4] == b"RIFF":
+        return size == int.from_bytes(head[4:8], "little") + 8
+    return tail.endswith(b"\xff\xd9") or tail.endswith(b"IEND\xaeB`\x82")
+
+def _rewind(entries: List[dict], count: int) -> List[dict]:
+    """The first *count* manifest entries as they stood when the last of them was captured: time
+    ranges opened later are dropped and its own range is left open."""
+    kept = [{**e, "ranges": [list(r) for r in e["ranges"]]} for e in entries[:count]]
+    if kept:
+        last_ms = kept[-1]["time_ms"]
+        for entry in kept[:-1]:
+            entry["ranges"] = [r for r in entry["ranges"] if r[0] < last_ms]
+        kept[-1]["ranges"] = [[last_ms, None]]
+    return kept
+
+def _save_checkpoint(path: Path, settings: dict, entries: List[dict], written: set[Path] | None = None) -> None:
+    """Atomically record extraction progress at *path*.
+
+    With *written* (the snapshot files known to be complete) the entries are recorded up to the
+    first one whose file is not, together with that last committed snapshot's index and media
+    time.  Without it the range is recorded as finished.
+    """
+    count = len(entries) if written is None else next(
+        (i for i, e in enumerate(entries) if path.parent / e["file"] not in written), len(entries))
+    kept = entries if written is None else _rewind(entries, count)
+    state = {"settings": settings, "complete": written is None, "index": count - 1,
+             "time_ms": kept[-1]["time_ms"] if kept else None, "entries": kept}
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, path)
+
+def _load_checkpoint(path: Path, settings: dict) -> dict | None:
+    """The checkpoint at *path* if it was written with the same *settings*, else ``None``.
+
+    Entries are cut back to before the first snapshot that is missing or truncated (a crash
+    mid-write, or a disk that filled up), so that snapshot and everything after it is redone.
+    """
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if state.get("settings") != settings:
+        return None
+    entries = state["entries"]
+    intact = next((i for i, e in enumerate(entries) if not _image_complete(path.parent / e["file"])), len(entries))
+    if intact < len(entries):
+        state.update(entries=_rewind(entries, intact), complete=False)
+    return state
+
+def _extract_range(video_path: Path, out_dir: Path, name_template: str, start_ms: float, end_ms: float, *,
+                   dedupe: int | None = None, decoder: str = "opencv", decoder_options: dict | None = None,
+                   writer_threads: int = DEFAULT_WRITER_THREADS, encoding: dict | None = None,
+                   checkpoint: Path | None = None, ocr_lang: str | None = None,
+                   ocr_threads: int = DEFAULT_OCR_THREADS, keep_snapshots: bool = True, ocr_processes: int = 0,
+                   max_memory: int | None = None, cv_threads: int | None = None, decoder_threads: int | None = None,
+                   ocr_engine: str = "cli", attach_proxies: bool = False, **options) -> List[dict]:
+    """Write the snapshots falling in ``[start_ms, end_ms)`` using *name_template*.
+
+    Opens its own *decoder* so it can run in a worker process; *options* are passed on to
+    :func:`_select_frames`.  With *dedupe* set, a frame whose perceptual hash is within that many
+    bits of an already written snapshot, and that shows the same slide (:func:`_same_slide`), is
+    not written; its time is credited to the earlier snapshot instead.  With *attach_proxies* each
+    entry carries its DEDUPE_WIDTH ``proxy`` for :func:`_merge_segments`, for runs without
+    *keep_snapshots* where there is no file to read it back from.  Files are written by a
+    :class:`_SnapshotWriter` with *writer_threads* threads, in the format described by *encoding*
+    (``format``, ``jpeg_quality``, ``png_compression``, ``gray``), and are all on disk when this
+    returns.  Returns manifest entries (file, time, hash and the ``[start, end)`` time ranges each
+    snapshot covers, the last one left open) in timeline order.
+
+    With a *checkpoint* path, progress is saved there every CHECKPOINT_SECONDS, when the range is
+    interrupted and when it finishes.  A checkpoint left by an earlier run with identical
+    settings is resumed: its intact snapshots are kept and extraction continues just after the
+    last one's media time.
+
+    With *ocr_lang* set, every snapshot is OCR-ed by :class:`_OcrWorkers` (*ocr_threads*) as soon
+    as it is on disk and the entries carry its ``text``; resumed entries may lack one.  With
+    *keep_snapshots* off as well, frames go to OCR straight from memory and nothing is written;
+    entries keep the name the file would have had; *ocr_processes* > 0 then runs OCR in
+    that many :class:`_OcrProcesses` workers instead of threads.  *ocr_engine* is passed to
+    :func:`_ocr_file` / :func:`_ocr_array`.
+
+    Every frame copied out of the decoder is charged to a :class:`_MemoryBudget` of *max_memory*
+    bytes until the writer or OCR stage is done with it; decoding pauses while it is spent.
+    *cv_threads* sets OpenCV's thread pool for this process and *decoder_threads* the codec's.
+    """
+    encoding = encoding or _snapshot_encoding()
+    ext = SNAPSHOT_FORMATS[encoding["format"]]
+    params = _imwrite_params(encoding["format"], encoding["jpeg_quality"], encoding["png_compression"])
+    stat = video_path.stat()
+    settings = json.loads(json.dumps(dict(  # as it reads back from disk
+        video=str(video_path), size=stat.st_size, mtime_ns=stat.st_mtime_ns, name_template=name_template,
+        start_ms=start_ms, end_ms=end_ms, dedupe=dedupe, decoder=decoder, decoder_options=decoder_options,
+        encoding=encoding, **options)))
+    state = _load_checkpoint(checkpoint, settings) if checkpoint is not None else None
+    entries: List[dict] = state["entries"] if state else []
+    if state and state["complete"]:
+        return entries
+    current: dict | None = entries[-1] if entries else None  # snapshot owning the open time range
+    resume_ms = max(start_ms, current["time_ms"] + 1.0) if current else start_ms
+
+    if cv_threads is not None:
+        cv2.setNumThreads(cv_threads)
+    cap = _open_decoder(video_path, decoder, decoder_threads, **(decoder_options or {}))
+    budget = _MemoryBudget(max_memory)
+    ocr: _OcrWorkers | _OcrProcesses | None = None
+    if ocr_lang and ocr_processes > 0 and not keep_snapshots:
+        full_frame = cap.get(cv2.CAP_PROP_FRAME_WIDTH) * cap.get(cv2.CAP_PROP_FRAME_HEIGHT) * 3
+        ocr = _OcrProcesses(ocr_lang, ocr_processes, int(full_frame), budget=budget, engine=ocr_engine)
+    elif ocr_lang:
+        ocr = _OcrWorkers(ocr_lang, ocr_threads, budget=budget, engine=ocr_engine)
+    writer = _SnapshotWriter(writer_threads, params=params, gray=encoding["gray"], budget=budget,
+                             on_written=ocr.submit if isinstance(ocr, _OcrWorkers) else None) if keep_snapshots else None
+    if writer is not None:
+        writer.written.update(out_dir / e["file"] for e in entries)
+    proxies: dict[str, np.ndarray | None] = {}  # of kept snapshots; resumed ones are read back lazily
+    proxy_of = lambda e: proxies[e["file"]] if e["file"] in proxies else proxies.setdefault(e["file"], _snapshot_proxy(out_dir / e["file"]))
+    saved_at = time.monotonic()
+    try:
+        with writer or contextlib.nullcontext():
+            for time_ms, frame, proxy in _select_frames(cap, resume_ms, end_ms, **options):
+                phash = _dhash(proxy)
+                detail = _analysis_proxy(frame, DEDUPE_WIDTH) if dedupe is not None or attach_proxies else None
+                owner = _find_duplicate(entries, phash, dedupe, detail, proxy_of) if dedupe is not None else None
+                if owner is None:  # only frames that become snapshots are copied out of the decode buffer
+                    snap_path = out_dir / name_template.format(idx=len(entries), ext=ext)
+                    budget.acquire(frame.nbytes)
+                    if writer is not None:
+                        writer.submit(snap_path, frame.copy())
+                    elif ocr is not None:
+                        ocr.submit_frame(snap_path.name, frame.copy())
+                    owner = {"file": snap_path.name, "time_ms": round(time_ms, 3), "hash": f"{phash:0{HASH_SIZE * HASH_SIZE // 4}x}", "ranges": []}
+                    entries.append(owner)
+                    if detail is not None:
+                        proxies[owner["file"]] = detail
+                    if attach_proxies:
+                        owner["proxy"] = detail
+                if owner is not current:
+                    if current is not None:
+                        current["ranges"][-1][1] = round(time_ms, 3)
+                    owner["ranges"].append([round(time_ms, 3), None])
+                    current = owner
+                if checkpoint is not None and time.monotonic() - saved_at >= CHECKPOINT_SECONDS:
+                    _save_checkpoint(checkpoint, settings, entries, writer.written)
+                    saved_at = time.monotonic()
+    except BaseException:  # includes Ctrl-C: keep whatever reached the disk
+        if ocr is not None:
+            ocr.close(cancel=True)
+        if checkpoint is not None:
+            _save_checkpoint(checkpoint, settings, entries, writer.written)
+        raise
+    finally:
+        cap.release()
+    if ocr is not None:
+        ocr.close()
+        for entry in entries:
+            if entry["file"] in ocr.texts:
+                entry["text"] = ocr.texts[entry["file"]]
+    if checkpoint is not None:
+        _save_checkpoint(checkpoint, settings, entries)
+    return entries
+
+def _segment_bounds(video_path: Path, interval_seconds: float, workers: int) -> List[tuple[float, float]]:
+    """Split the timeline into at most *workers* ranges whose edges sit on the sampling grid.
+
+    The length comes from the container's frame count and nominal rate, which is only an
+    estimate on VFR streams, so the last range is left open-ended.  A single unbounded range
+    is returned when the length is unknown.
+    """
+    cap = _open_decoder(video_path)
+    fps, frames = cap.get(cv2.CAP_PROP_FPS), cap.get(cv2.CAP_PROP_FRAME_COUNT)
     cap.release()
+    if workers <= 1 or fps <= 0 or frames <= 0:
+        return [(0.0, float("inf"))]
+
+    interval_ms = interval_seconds * 1000.0
+    targets = max(1, math.ceil(frames * 1000.0 / fps / interval_ms))
+    workers = min(workers, targets)
+    edges = [(targets * i // workers) * interval_ms for i in range(workers)] + [float("inf")]
+    return list(zip(edges, edges[1:]))
+
+def _merge_segments(out_dir: Path, parts: List[List[dict]], dedupe: int | None, keep_snapshots: bool = True) -> List[dict]:
+    """Stitch per-segment manifests into one numbered snapshot sequence.
+
+    Each segment's open trailing range is closed where the next segment begins.  Segments do
+    not dedupe themselves: with *dedupe* set, it happens here, over all snapshots in timeline
+    order exactly as a single range would (see :func:`_find_duplicate`), so the result does
+    not depend on the number of workers.  Duplicates are deleted and their ranges
+    credited to the kept snapshot.  Without *keep_snapshots* there are no files to rename or
+    delete, only entries, and proxies come from the entries instead of the files.
+    """
+    proxies: dict[str, np.ndarray | None] = {}
+    def proxy_of(entry: dict) -> np.ndarray | None:
+        if entry["file"] not in proxies:
+            proxies[entry["file"]] = entry["proxy"] if "proxy" in entry else _snapshot_proxy(out_dir / entry["file"])
+        return proxies[entry["file"]]
+
+    entries: List[dict] = []
+    open_range: list | None = None
+    for part in filter(None, parts):
+        if open_range is not None:
+            open_range[1] = part[0]["time_ms"]
+        for entry in part:
+            owner = _find_duplicate(entries, int(entry["hash"], 16), dedupe, proxy_of(entry), proxy_of) if dedupe is not None else None
+            if owner is None:
+                name = SNAP_NAME_TEMPLATE.format(idx=len(entries), ext=Path(entry["file"]).suffix)
+                if keep_snapshots:
+                    os.replace(out_dir / entry["file"], out_dir / name)
+                entries.append({**entry, "file": name})
+            else:
+                if keep_snapshots:
+                    (out_dir / entry["file"]).unlink()
+                owner["ranges"] = sorted(owner["ranges"] + entry["ranges"], key=lambda r: r[0])
+        open_range = next(r for entry in part for r in entry["ranges"] if r[1] is None)
+
+    for entry in entries:  # join ranges that became adjacent across segment edges
+        joined: list = []
+        for r in entry["ranges"]:
+            if joined and joined[-1][1] == r[0]:
+                joined[-1][1] = r[1]
+            else:
+                joined.append(list(r))
+        entry["ranges"] = joined
+    return entries
+
+def _time_decode(video_path: Path, decoder: str, decoder_options: dict, cv_threads: int | None,
+                 decoder_threads: int | None, seconds: float) -> float:
+    """Wall time to decode the first *seconds* of *video_path* and build the analysis proxy of
+    every frame, with the given OpenCV and decoder thread counts."""
+    if cv_threads is not None:
+        cv2.setNumThreads(cv_threads)
+    cap = _open_decoder(video_path, decoder, decoder_threads, **decoder_options)
+    started, frame = time.perf_counter(), None
+    try:
+        while cap.grab() and cap.get(cv2.CAP_PROP_POS_MSEC) < seconds * 1000.0:
+            ok, frame = cap.retrieve(frame)
+            if ok:
+                _analysis_proxy(frame)
+    finally:
+        cap.release()
+    return time.perf_counter() - started
+
+def _tune_threads(video_path: Path, *, decoder: str = "opencv", decoder_options: dict | None = None,
+                  workers: int = 1, seconds: float = CALIBRATION_SECONDS) -> tuple[int, int, float]:
+    """Pick OpenCV and decoder thread counts for this host by timing the first *seconds* of
+    *video_path* under a few candidates.
+
+    Each candidate runs in *workers* processes at once, like the real extraction, so that
+    oversubscription shows up in the timing.  Candidates are one thread, a fair share of the
+    cores per worker, and every core; a larger count has to beat a smaller one by 5 % to be
+    picked.  Returns ``(cv_threads, decoder_threads, seconds spent calibrating)``.
+    """
+    decoder_options = decoder_options or {}
+    cores = os.cpu_count() or 1
+    counts = sorted({1, max(1, cores // max(workers, 1)), cores})
+    candidates = sorted(((cv, dec) for cv in counts for dec in counts), key=sum)
+    started = time.perf_counter()
+    best: tuple[float, int, int] | None = None
+    with ProcessPoolExecutor(max_workers=max(workers, 1)) as pool:
+        for cv_threads, decoder_threads in candidates:
+            runs = [pool.submit(_time_decode, video_path, decoder, decoder_options, cv_threads, decoder_threads, seconds)
+                    for _ in range(max(workers, 1))]
+            elapsed = max(run.result() for run in runs)
+            if best is None or elapsed < best[0] * 0.95:
+                best = (elapsed, cv_threads, decoder_threads)
+    assert best is not None
+    return best[1], best[2], time.perf_counter() - started
+
+def extract_snapshots(video_path: Path, interval_seconds: int = DEFAULT_INTERVAL, *, sampling: str = DEFAULT_SAMPLING,
+                      workers: int = 1, mode: str = "interval", scan_step: float = DEFAULT_SCAN_STEP,
+                      change_threshold: float = DEFAULT_CHANGE_THRESHOLD, min_dwell: float = DEFAULT_MIN_DWELL,
+                      dedupe: int | None = None, settle_frames: int = 0, decoder: str | None = None,
+                      keyframes_only: bool = False, decoder_fps: float | None = None, decoder_width: int | None = None,
+                      decoder_gray: bool = False, writer_threads: int = DEFAULT_WRITER_THREADS,
+                      snapshot_format: str = "jpeg", jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+                      png_compression: int = DEFAULT_PNG_COMPRESSION, gray: bool = False,
+                      crop_slide: bool = False, deskew: bool = False, bisect_resolution: float = DEFAULT_BISECT_RESOLUTION,
+                      resume: bool = True, ocr_lang: str | None = None, ocr_threads: int | None = None,
+                      keep_snapshots: bool = True, ocr_processes: int = 0, max_memory: int | None = None,
+                      cv_threads: int | None = None, decoder_threads: int | None = None, ocr_engine: str = "cli") -> Path:
+    """Extract snapshots from *video_path*.
+
+    In ``"interval"`` *mode* a frame is taken every *interval_seconds* seconds of media time.  In
+    ``"change"`` mode the video is scanned every *scan_step* seconds and a snapshot is taken only
+    when the slide changes: more than *change_threshold* of the (downsampled) pixels differ from
+    the previous scan, and the new content stays for at least *min_dwell* seconds.  ``"bisect"``
+    mode runs the same scan, typically with a coarse *scan_step*, then finds each slide's start
+    time to within *bisect_resolution* seconds by bisecting the step it changed in with seeks.
+
+    *decoder* picks the backend: ``"opencv"`` (``cv2.VideoCapture``) or ``"ffmpeg"``
+    (:class:`FFmpegDecoder`).  It defaults to OpenCV unless one of the ffmpeg-only options is
+    given: *keyframes_only* decodes I-frames alone, which on screen recordings, where nearly every
+    new slide starts a keyframe, finds almost every slide at a fraction of the cost; *decoder_fps*,
+    *decoder_width* and *decoder_gray* thin, scale and desaturate frames inside ffmpeg.  The
+    interval or change logic then runs over whatever the decoder delivers.  With *crop_slide* every
+    frame is cropped to the slide found in it (the largest quadrilateral that stands out from its
+    surroundings, searched again whenever the scene changes); *deskew* additionally
+    perspective-corrects it, for camera shots of a projector screen.  With *settle_frames* > 0,
+    each capture is delayed until that many consecutive frames show no change, so fades and bullet
+    builds have finished before the snapshot is taken.  With *dedupe* set, frames whose 256-bit
+    perceptual hash lies within that many bits of an already kept snapshot, and that show the same
+    slide at DEDUPE_WIDTH, are dropped (with several *workers*, while merging the segments, so the
+    result is the same).
+
+    Snapshots are stored inside ``<video_stem>_snapshots`` sitting next to the video, together
+    with a ``snapshots.json`` manifest recording each snapshot's presentation time, hash and the
+    time ranges it covers.  *snapshot_format* is ``"jpeg"`` (*jpeg_quality* 0-100), ``"png"``
+    (*png_compression* 0-9) or lossless ``"webp"``; *gray* stores single-channel images.
+    *sampling* selects how frames are reached: ``"seek"`` jumps to each snapshot time, while
+    ``"linear"`` decodes the whole stream.  With *workers* > 1 the timeline is split into that
+    many ranges, each decoded by its own process and capture.  Snapshots are encoded and written
+    by *writer_threads* background threads per decoder (0 writes inline); every file is on disk
+    before this returns.  The directory path is returned.
+
+    Progress is checkpointed to ``.checkpoint.json`` in the snapshot directory (one file per
+    range with *workers* > 1).  If a run is killed, rerunning it with the same settings and
+    *resume* left on continues after the last snapshot that reached the disk intact; the
+    checkpoint is removed once the manifest is written.
+
+    With *ocr_lang* set, extraction and OCR are fused: each snapshot is handed to *ocr_threads*
+    tesseract workers per decoder (by default DEFAULT_OCR_THREADS split between the *workers*)
+    the moment it is on disk, through a bounded queue that slows
+    decoding down when OCR falls behind, and ``<video_stem>_slides.txt`` is written at the end,
+    the same file :func:`ocr_snapshots` would produce.  Wall time then approaches the slower of
+    decoding and OCR rather than their sum.  Turning *keep_snapshots* off as well skips the
+    images altogether: frames go from the decoder to tesseract in memory, no snapshot
+    directory, manifest or checkpoint is created, the text file labels each snapshot with its
+    media time, and the text file's path is returned instead of the directory.  In that mode
+    *ocr_processes* > 0 runs OCR in worker processes that read frames from a shared-memory
+    ring buffer rather than in threads.  *ocr_engine* selects the backend as in
+    :func:`ocr_snapshots`.
+
+    *max_memory* caps, in bytes, the frames held in flight between decoding, the writer and OCR
+    queues and the shared-memory ring (split evenly between *workers*); a decoder stalls until
+    its consumers free enough of it.  None leaves only the queue-length bounds.
+
+    *cv_threads* sizes OpenCV's internal thread pool and *decoder_threads* the codec's decoding
+    threads, in every decoder process; None keeps the library defaults, which assume they
+    have the whole machine.  The values used are recorded in the manifest.
+    """
+    if sampling not in SAMPLING_STRATEGIES:
+        raise ValueError(f"Unknown sampling strategy {sampling!r}; expected one of {SAMPLING_STRATEGIES}")
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown extraction mode {mode!r}; expected one of {EXTRACTION_MODES}")
+    if snapshot_format not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Unknown snapshot format {snapshot_format!r}; expected one of {tuple(SNAPSHOT_FORMATS)}")
+    if not keep_snapshots and not ocr_lang:
+        raise ValueError("keep_snapshots=False needs ocr_lang: the OCR text is the only output")
+    if ocr_lang:
+        _check_ocr_engine(ocr_engine)
+    decoder, decoder_options = _decoder_settings(decoder, keyframes_only, decoder_fps, decoder_width, decoder_gray)
+
+    video_path = video_path.expanduser().resolve()
+    if not video_path.exists():
+        raise FileNotFoundError(video_path)
+
+    out_dir = video_path.parent / f"{video_path.stem}_snapshots"
+    if keep_snapshots:
+        out_dir.mkdir(exist_ok=True)
+    for leftover in out_dir.glob(".*.partial.*"):  # images a killed run was still encoding
+        leftover.unlink()
+    checkpoints = lambda: out_dir.glob(f"*{CHECKPOINT_NAME}")
+    if not resume:
+        for path in checkpoints():
+            path.unlink()
+
+    options = dict(interval_seconds=interval_seconds, sampling=sampling, mode=mode, scan_step=scan_step,
+                   change_threshold=change_threshold, min_dwell=min_dwell, dedupe=dedupe,
+                   settle_frames=settle_frames, crop_slide=crop_slide, deskew=deskew, bisect_resolution=bisect_resolution,
+                   decoder=decoder, decoder_options=decoder_options,
+                   writer_threads=writer_threads, ocr_lang=ocr_lang, keep_snapshots=keep_snapshots,
+                   ocr_processes=ocr_processes,
+                   encoding=_snapshot_encoding(snapshot_format, jpeg_quality, png_compression, gray))
+    segments = _segment_bounds(video_path, interval_seconds if mode == "interval" else scan_step, workers)
+    # Resource settings: not part of the checkpoint fingerprint
+    options.update(max_memory=max_memory // len(segments) if max_memory is not None else None,
+                   ocr_threads=ocr_threads or max(DEFAULT_OCR_THREADS // len(segments), 1),
+                   cv_threads=cv_threads, decoder_threads=decoder_threads, ocr_engine=ocr_engine)
+    if len(segments) == 1:
+        entries = _extract_range(video_path, out_dir, SNAP_NAME_TEMPLATE, *segments[0],
+                                 checkpoint=out_dir / CHECKPOINT_NAME if keep_snapshots else None, **options)
+    else:
+        # Workers write under hidden per-segment names; renumber into one sequence afterwards
+        with ProcessPoolExecutor(max_workers=len(segments)) as pool:
+            futures = [pool.submit(_extract_range, video_path, out_dir, f".segment{seg:03d}_{{idx:05d}}{{ext}}", start, end,
+                                   checkpoint=out_dir / f".segment{seg:03d}{CHECKPOINT_NAME}" if keep_snapshots else None,
+                                   **{**options, "dedupe": None},  # deduped across segments while merging
+                                   attach_proxies=dedupe is not None and not keep_snapshots)
+                       for seg, (start, end) in enumerate(segments)]
+            parts = [f.result() for f in futures]
+        entries = _merge_segments(out_dir, parts, dedupe, keep_snapshots)
+
+    if not keep_snapshots:
+        if not entries:
+            raise RuntimeError(f"No snapshots found in {video_path}")
+        return _write_slides_text(video_path, ((_media_time(e["time_ms"]), e["text"]) for e in entries))
+
+    texts: List[tuple[str, str]] = []
+    for entry in entries:
+        text = entry.pop("text", None)  # the manifest does not keep OCR output
+        if ocr_lang:  # snapshots resumed from an earlier run were never queued for OCR
+            texts.append((entry["file"], text if text is not None else _ocr_file(out_dir / entry["file"], ocr_lang, ocr_engine)))
+    _write_manifest(out_dir, entries, encoding=options["encoding"], threads=dict(opencv=cv_threads, decoder=decoder_threads))
+    for path in checkpoints():
+        path.unlink()
+    if ocr_lang:
+        if not entries:
+            raise RuntimeError(f"No snapshots found in {out_dir}")
+        _write_slides_text(video_path, texts)
     return out_dir
 
+def _media_time(time_ms: float) -> str:
+    """``HH:MM:SS.mmm`` label for a media time."""
+    seconds = time_ms / 1000.0
+    return f"{int(seconds // 3600):02d}:{int(seconds // 60 % 60):02d}:{seconds % 60:06.3f}"
+
 def _iter_snapshots(snapshot_dir: Path) -> Iterable[Path]:
-    """Yield snapshot paths in natural (numeric) order."""
-    snapshots = sorted(snapshot_dir.glob("snapshot_*.jpg"))
+    """Yield snapshot paths in natural (numeric) order.
+
+    When a manifest is present its files are used, so leftovers from an earlier extraction with
+    another interval or format are ignored.  Otherwise any of the SNAPSHOT_FORMATS is picked up.
+    """
+    listed = [snapshot_dir / e["file"] for e in _read_manifest(snapshot_dir).get("snapshots", [])]
+    if listed and all(p.exists() for p in listed):
+        snapshots = listed
+    else:
+        extensions = set(SNAPSHOT_FORMATS.values())
+        snapshots = [p for p in snapshot_dir.glob("snapshot_*") if p.suffix.lower() in extensions]
     # Natural sort by the numeric part to avoid 10 < 2 issues
-    key = lambda p: int(re.search(r"(\d+)(?=\.jpg$)", p.name).group(1)) # type: ignore
+    key = lambda p: int(re.search(r"(\d+)(?=\.\w+$)", p.name).group(1)) # type: ignore
     return sorted(snapshots, key=key)
 
-def ocr_snapshots(video_path: Path, snapshot_dir: Path | None = None, *, lang: str = "eng") -> Path:
+def _ocr_engine_version(engine: str) -> str | None:
+    """Tesseract version behind *engine* (e.g. ``"5.3.4"``), or None if it cannot be queried."""
+    try:
+        if engine == "tesserocr":
+            import tesserocr
+            return tesserocr.tesseract_version().split()[1]
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return None
+
+class OcrCache:
+    """OCR results kept in SQLite across runs and videos.
+
+    Entries are keyed by the SHA-256 of the image file, the language codes, the engine, the
+    Tesseract version and the OCR config (:func:`_ocr_config`), so an identical slide extracted
+    from another video, or the same snapshot OCR-ed again, is a lookup.  A cache written before the
+    config was part of the key is dropped on open.  The database runs in WAL mode with a busy
+    timeout: several processes (parallel runs, ``--dir`` batches on one host) can read and write it
+    at once.  Once the stored text exceeds *max_bytes*, :meth:`evict` drops the least recently used
+    entries down to 90 % of it.  :attr:`hits`, :attr:`misses` and :attr:`evicted` count this
+    instance's lookups and evictions.
+    """
+
+    def __init__(self, path: Path = DEFAULT_OCR_CACHE, max_bytes: int = DEFAULT_OCR_CACHE_SIZE) -> None:
+        self.path, self.max_bytes = Path(path).expanduser(), max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=60.0, isolation_level=None)  # transactions are explicit
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._transaction() as db:
+            columns = [row[1] for row in db.execute("PRAGMA table_info(ocr)")]
+            if columns and "config" not in columns:  # keys without the config could be stale
+                db.execute("DROP TABLE ocr")
+            db.execute("CREATE TABLE IF NOT EXISTS ocr (digest TEXT NOT NULL, lang TEXT NOT NULL, engine TEXT NOT NULL,"
+                       " version TEXT NOT NULL, config TEXT NOT NULL, text TEXT NOT NULL, size INTEGER NOT NULL,"
+                       " used REAL NOT NULL, PRIMARY KEY (digest, lang, engine, version, config))")
+            db.execute("CREATE INDEX IF NOT EXISTS ocr_used ON ocr (used)")
+        self.hits = self.misses = self.evicted = 0
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        self._db.execute("BEGIN IMMEDIATE")  # take the write lock up front: no upgrade deadlocks between processes
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def get_many(self, keys: Iterable[tuple[str, str, str, str, str]]) -> dict[tuple[str, str, str, str, str], str]:
+        """Cached texts for ``(digest, lang, engine, version, config)`` *keys*; misses are left out."""
+        keys, found = list(keys), {}
+        with self._transaction() as db:
+            for key in keys:
+                row = db.execute("SELECT text FROM ocr WHERE digest=? AND lang=? AND engine=? AND version=? AND config=?", key).fetchone()
+                if row is not None:
+                    found[key] = row[0]
+                    db.execute("UPDATE ocr SET used=? WHERE digest=? AND lang=? AND engine=? AND version=? AND config=?", (time.time(), *key))
+        self.hits += sum(key in found for key in keys)
+        self.misses += sum(key not in found for key in keys)
+        return found
+
+    def put_many(self, items: Iterable[tuple[tuple[str, str, str, str, str], str]]) -> None:
+        with self._transaction() as db:
+            db.executemany("INSERT OR REPLACE INTO ocr VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                           [(*key, text, len(text.encode("utf-8")), time.time()) for key, text in items])
+
+    def evict(self) -> None:
+        with self._transaction() as db:
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM ocr").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            doomed = []
+            for rowid, size in db.execute("SELECT rowid, size FROM ocr ORDER BY used"):
+                if total <= 0.9 * self.max_bytes:
+                    break
+                doomed.append((rowid,))
+                total -= size
+            db.executemany("DELETE FROM ocr WHERE rowid=?", doomed)
+        self.evicted += len(doomed)
+
+    def stats(self) -> dict:
+        """This instance's hits, misses and evictions plus the entries and text bytes stored."""
+        entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr").fetchone()
+        return dict(hits=self.hits, misses=self.misses, evicted=self.evicted, entries=entries, bytes=size)
+
+    def close(self) -> None:
+        self._db.close()
+
+def _single_threaded_tesseract() -> None:
+    """One OpenMP thread per tesseract run started from this process, for callers that already
+    keep every core busy with parallel runs (an OMP_THREAD_LIMIT set by the user wins)."""
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+def _file_digest(path: Path) -> str:
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+def _load_ocr_index(path: Path, settings: dict) -> List[dict]:
+    """Entries of the incremental OCR index at *path*, or none if it is missing, unreadable or
+    was written with other OCR *settings*."""
+    try:
+        index = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    return index.get("snapshots", []) if index.get("settings") == settings else []
+
+def _save_ocr_index(path: Path, settings: dict, entries: List[dict]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({"settings": settings, "snapshots": entries}, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+def _ocr_paths(snaps: List[Path], lang: str, *, jobs: int = 1, engine: str = "cli", batch: int = 1) -> List[str]:
+    """Texts of *snaps* in order, OCR-ed *batch* per call of :func:`_ocr_files` in *jobs* processes."""
+    chunks = [snaps[i:i + max(batch, 1)] for i in range(0, len(snaps), max(batch, 1))]
+    if jobs <= 1 or len(chunks) <= 1:
+        return [text for chunk in chunks for text in _ocr_files(chunk, lang, engine)]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(chunks)), initializer=_single_threaded_tesseract) as pool:
+        results = pool.map(_ocr_files, chunks, [lang] * len(chunks), [engine] * len(chunks))
+        return [text for texts in results for text in texts]
+
+def ocr_snapshots(video_path: Path, snapshot_dir: Path | None = None, *, lang: str = "eng", jobs: int = 1,
+                  engine: str = "cli", batch: int = 1, cache: OcrCache | None = None, incremental: bool = True) -> Path:
     """Run Tesseract OCR over each snapshot image and collate results into one text file.
 
     *video_path* is used to derive default locations/names, even if snapshots were generated
     previously.  If *snapshot_dir* is omitted it defaults to ``<video_stem>_snapshots``.
     The combined text is written to ``<video_stem>_slides.txt`` next to the video and the path
-    is returned.
+    is returned.  With *jobs* > 1 snapshots are OCR-ed by that many worker processes; results
+    are collected in snapshot order, so the file is the same as with one.
+
+    *engine* ``"cli"`` runs the tesseract binary through pytesseract, which writes a temporary
+    image and loads the language data again for every snapshot.  ``"tesserocr"`` keeps one
+    libtesseract engine loaded per worker (thread or process) and feeds it every image,
+    producing the same text without the per-image start-up; it needs the tesserocr package.
+    With the ``"cli"`` engine and *batch* > 1, snapshots are instead OCR-ed *batch* at a time,
+    one tesseract run per chunk (see :func:`_ocr_files`); with *jobs* the chunks are spread
+    over the processes, so keep *batch* well below ``snapshots / jobs``.
+
+    With a *cache*, snapshots whose text is already in it are not OCR-ed again, and new
+    results are added to it (failures are not cached).  Lookups and writes happen in this
+    process only, around the OCR of the misses.
+
+    Next to the text file, ``<video_stem>_slides.index.json`` records the size, mtime, SHA-256
+    and text block of every snapshot.  With *incremental* on, a rerun with the same language
+    and engine reuses the block of each snapshot whose size and mtime are unchanged, without
+    reading it, and of each snapshot whose content hash matches any indexed one (e.g. files
+    renumbered by a new extraction).  Only the rest is OCR-ed and spliced in, so a rerun over
+    unchanged snapshots writes the same file without running tesseract.  Failed blocks are
+    always retried.
     """
+    _check_ocr_engine(engine)
+    if batch > 1 and engine != "cli":
+        raise ValueError(f"batch only applies to the cli engine, not {engine!r}")
     video_path = video_path.expanduser().resolve()
     if snapshot_dir is None:
         snapshot_dir = video_path.parent / f"{video_path.stem}_snapshots"
@@ -106,31 +1788,89 @@ def ocr_snapshots(video_path: Path, snapshot_dir: Path | None = None, *, lang: s
     if not snapshots:
         raise RuntimeError(f"No snapshots found in {snapshot_dir}")
 
-    ocr_lines: List[str] = []
-    for idx, snap in enumerate(snapshots):
-        try:
-            img = Image.open(snap)
-            text = pytesseract.image_to_string(img, lang=lang)
-            ocr_lines.append(f"# Snapshot {idx} — {snap.name}\n{text}\n")
-        except Exception as e:
-            ocr_lines.append(f"# Snapshot {idx} — {snap.name}\n[OCR failed: {e}]\n")
+    version = _ocr_engine_version(engine)
+    index_path = video_path.with_name(f"{video_path.stem}{SLIDES_INDEX_SUFFIX}")
+    settings = dict(lang=lang, engine=engine, version=version, config=_ocr_config())
+    indexed = [e for e in (_load_ocr_index(index_path, settings) if incremental and version is not None else [])
+               if not e["text"].startswith("[OCR failed")]
+    by_name, by_digest = {e["file"]: e for e in indexed}, {e["sha256"]: e for e in indexed}
 
-    out_txt = video_path.with_name(f"{video_path.stem}_slides.txt")
-    out_txt.write_text("\n".join(ocr_lines), encoding="utf-8")
+    records: dict[Path, dict] = {}
+    texts: dict[Path, str] = {}
+    for snap in snapshots:
+        stat = snap.stat()
+        records[snap] = dict(file=snap.name, size=stat.st_size, mtime_ns=stat.st_mtime_ns, sha256=None)
+        old = by_name.get(snap.name)
+        if old is not None and (old["size"], old["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            records[snap]["sha256"], texts[snap] = old["sha256"], old["text"]
+    for snap in snapshots:  # only new or touched files are read and hashed
+        if snap not in texts:
+            digest = records[snap]["sha256"] = _file_digest(snap)
+            if digest in by_digest:
+                texts[snap] = by_digest[digest]["text"]
+
+    keys: dict[Path, tuple[str, str, str, str]] = {}
+    if cache is not None and version is not None:  # without a version a cached text could be stale
+        keys = {snap: (records[snap]["sha256"], lang, engine, version, _ocr_config()) for snap in snapshots if snap not in texts}
+        found = cache.get_many(keys.values())
+        texts.update((snap, found[key]) for snap, key in keys.items() if key in found)
+    missing = [snap for snap in snapshots if snap not in texts]
+    texts.update(zip(missing, _ocr_paths(missing, lang, jobs=jobs, engine=engine, batch=batch)))
+    if keys:
+        cache.put_many((keys[snap], texts[snap]) for snap in missing if not texts[snap].startswith("[OCR failed"))  # type: ignore[union-attr]
+        cache.evict()  # type: ignore[union-attr]
+    out_txt = _write_slides_text(video_path, ((snap.name, texts[snap]) for snap in snapshots))
+    _save_ocr_index(index_path, settings, [{**records[snap], "text": texts[snap]} for snap in snapshots])
     return out_txt
 
-def process_video(video_path: Path, *, do_snaps: bool, do_ocr: bool, interval: int, lang: str) -> None:
-    """Apply requested operations to a single video file."""
+def process_video(video_path: Path, *, do_snaps: bool, do_ocr: bool, interval: int, lang: str,
+                  pipeline: bool = False, keep_snapshots: bool = True, auto_threads: bool = False, jobs: int = 1,
+                  ocr_engine: str = "cli", ocr_batch: int = 1, ocr_cache: OcrCache | None = None,
+                  incremental_ocr: bool = True, **extract_options) -> None:
+    """Apply requested operations to a single video file.
+
+    *extract_options* are forwarded to :func:`extract_snapshots`.  With *pipeline* (and both
+    *do_snaps* and *do_ocr*) OCR runs while snapshots are still being extracted; without
+    *keep_snapshots* frames are OCR-ed in memory and only the text file is written.  With
+    *auto_threads*, OpenCV and decoder thread counts not given explicitly are picked by
+    :func:`_tune_threads` on this video first.  *jobs*, *ocr_batch*, *ocr_cache* and
+    *incremental_ocr* are passed to :func:`ocr_snapshots`, and *ocr_engine* to whichever
+    function does the OCR.
+    """
     print(f"→ {video_path}")
     snapshots_dir: Path | None = None
+    if do_snaps or not keep_snapshots:
+        tuned = ""
+        if auto_threads:
+            decoder, decoder_options = _decoder_settings(
+                extract_options.get("decoder"), extract_options.get("keyframes_only", False), extract_options.get("decoder_fps"),
+                extract_options.get("decoder_width"), extract_options.get("decoder_gray", False))
+            cv_threads, decoder_threads, spent = _tune_threads(video_path, decoder=decoder, decoder_options=decoder_options,
+                                                               workers=extract_options.get("workers", 1))
+            extract_options["cv_threads"] = extract_options.get("cv_threads") or cv_threads
+            extract_options["decoder_threads"] = extract_options.get("decoder_threads") or decoder_threads
+            tuned = f" (auto-tuned in {spent:.1f} s)"
+        if auto_threads or extract_options.get("cv_threads") or extract_options.get("decoder_threads"):
+            print(f"   Threads → OpenCV {extract_options.get('cv_threads') or 'default'}, "
+                  f"decoder {extract_options.get('decoder_threads') or 'default'}{tuned}")
+    if not keep_snapshots:
+        txt = extract_snapshots(video_path, interval, ocr_lang=lang, keep_snapshots=False, ocr_engine=ocr_engine, **extract_options)
+        print(f"   OCR → {txt}")
+        return
+    if do_snaps and do_ocr and pipeline:
+        snapshots_dir = extract_snapshots(video_path, interval, ocr_lang=lang, ocr_engine=ocr_engine, **extract_options)
+        print(f"   Snapshots → {snapshots_dir}")
+        print(f"   OCR → {video_path.with_name(f'{video_path.stem}_slides.txt')}")
+        return
     if do_snaps:
-        snapshots_dir = extract_snapshots(video_path, interval)
+        snapshots_dir = extract_snapshots(video_path, interval, **extract_options)
         print(f"   Snapshots → {snapshots_dir}")
     else:
         snapshots_dir = video_path.parent / f"{video_path.stem}_snapshots"
 
     if do_ocr:
-        txt = ocr_snapshots(video_path, snapshots_dir, lang=lang)
+        txt = ocr_snapshots(video_path, snapshots_dir, lang=lang, jobs=jobs, engine=ocr_engine, batch=ocr_batch, cache=ocr_cache,
+                            incremental=incremental_ocr)
         print(f"   OCR → {txt}")
 
 def _cli() -> None:
@@ -144,6 +1884,42 @@ def _cli() -> None:
     parser.add_argument("--snapshots", action="store_true", help="Extract snapshots from video(s).")
     parser.add_argument("--ocr", action="store_true", help="Run OCR on snapshot(s).")
     parser.add_argument("--interval", type=int, default=DEFAULT_INTERVAL, help="Snapshot interval in seconds (default 30).")
+    parser.add_argument("--sampling", choices=SAMPLING_STRATEGIES, default=DEFAULT_SAMPLING, help="How snapshot frames are reached: 'seek' (default) or 'linear'.")
+    parser.add_argument("--workers", type=int, default=1, help="Decoder processes per video, each handling a slice of the timeline (default 1).")
+    parser.add_argument("--mode", choices=EXTRACTION_MODES, default="interval", help="'interval' (default) snapshots on a fixed cadence; 'change' only when the slide changes; 'bisect' like change, with start times refined by seeking.")
+    parser.add_argument("--scan-step", type=float, default=DEFAULT_SCAN_STEP, help="Change mode: seconds between analysed frames (default 1).")
+    parser.add_argument("--change-threshold", type=float, default=DEFAULT_CHANGE_THRESHOLD, help="Change mode: fraction of pixels that must differ to count as a new slide (default 0.005).")
+    parser.add_argument("--min-dwell", type=float, default=DEFAULT_MIN_DWELL, help="Change mode: seconds a new slide must stay on screen to be captured (default 1).")
+    parser.add_argument("--bisect-resolution", type=float, default=DEFAULT_BISECT_RESOLUTION, help="Bisect mode: precision in seconds of the refined slide start times (default 0.04).")
+    parser.add_argument("--decoder", choices=DECODERS, help="Decoder backend (default opencv, or ffmpeg when an ffmpeg-only option is set).")
+    parser.add_argument("--keyframes", action="store_true", help="Decode keyframes only (ffmpeg decoder); combines with --mode.")
+    parser.add_argument("--decoder-fps", type=float, help="ffmpeg decoder: drop frames down to this rate before they reach Python.")
+    parser.add_argument("--decoder-width", type=int, help="ffmpeg decoder: scale frames to this width (snapshots too).")
+    parser.add_argument("--decoder-gray", action="store_true", help="ffmpeg decoder: emit grayscale frames (snapshots too).")
+    parser.add_argument("--crop-slide", action="store_true", help="Crop every frame to the detected slide rectangle.")
+    parser.add_argument("--deskew", action="store_true", help="Crop to the detected slide and correct its perspective (implies --crop-slide).")
+    parser.add_argument("--settle-frames", type=int, default=0, metavar="K", help="Delay each capture until K consecutive frames are unchanged (default 0: off).")
+    parser.add_argument("--dedupe", type=int, metavar="BITS", help="Drop snapshots whose perceptual hash is within BITS (of 256) of a kept one and that show the same slide, e.g. 10.")
+    parser.add_argument("--format", dest="snapshot_format", choices=SNAPSHOT_FORMATS, default="jpeg", help="Snapshot image format: jpeg (default), png or lossless webp.")
+    parser.add_argument("--jpeg-quality", type=int, default=DEFAULT_JPEG_QUALITY, help="JPEG quality 0-100 (default 95).")
+    parser.add_argument("--png-compression", type=int, default=DEFAULT_PNG_COMPRESSION, help="PNG compression level 0-9 (default 3).")
+    parser.add_argument("--gray", action="store_true", help="Store snapshots as single-channel grayscale.")
+    parser.add_argument("--writer-threads", type=int, default=DEFAULT_WRITER_THREADS, help="Background threads encoding/writing snapshots (default 4, 0 = inline).")
+    parser.add_argument("--no-resume", dest="resume", action="store_false", help="Ignore the checkpoint of an interrupted run and extract from the start.")
+    parser.add_argument("--pipeline", action="store_true", help="With --snapshots --ocr: OCR each snapshot as soon as it is written.")
+    parser.add_argument("--ocr-threads", type=int, help="Pipeline mode: concurrent tesseract runs per decoder (default: CPU count divided by --workers).")
+    parser.add_argument("--jobs", type=int, default=1, help="OCR existing snapshots in N worker processes (default 1).")
+    parser.add_argument("--no-keep-snapshots", dest="keep_snapshots", action="store_false", help="With --ocr: OCR frames in memory and write nothing but the text file.")
+    parser.add_argument("--ocr-processes", type=int, default=0, help="With --no-keep-snapshots: OCR in N worker processes fed through a shared-memory ring buffer (default 0: threads).")
+    parser.add_argument("--cv-threads", type=int, help="Size of OpenCV's internal thread pool in each decoder process (default: OpenCV's choice).")
+    parser.add_argument("--decoder-threads", type=int, help="Codec decoding threads per decoder (default: the backend's choice).")
+    parser.add_argument("--auto-threads", action="store_true", help="Time a few thread settings on the first seconds of each video and use the fastest.")
+    parser.add_argument("--max-memory", type=_parse_size, metavar="SIZE", help="Budget for frames in flight between decoder, writer and OCR, e.g. 2G (default: unlimited).")
+    parser.add_argument("--ocr-engine", choices=OCR_ENGINES, default="cli", help="'cli' runs the tesseract binary per image (default); 'tesserocr' keeps libtesseract loaded in each worker.")
+    parser.add_argument("--ocr-batch", type=int, default=1, metavar="N", help="cli engine: OCR existing snapshots N per tesseract run (default 1).")
+    parser.add_argument("--ocr-cache", type=Path, nargs="?", const=DEFAULT_OCR_CACHE, metavar="PATH", help=f"Reuse OCR results across runs from this SQLite file (default path: {DEFAULT_OCR_CACHE}).")
+    parser.add_argument("--ocr-cache-size", type=_parse_size, default=DEFAULT_OCR_CACHE_SIZE, metavar="SIZE", help="Text kept in the OCR cache before the least recently used entries are evicted (default 256M).")
+    parser.add_argument("--no-incremental", dest="incremental_ocr", action="store_false", help="OCR every snapshot again instead of only new or changed ones.")
     parser.add_argument("--lang", default="eng", help="Tesseract language codes, e.g. 'eng+fra'.")
 
     args = parser.parse_args()
@@ -165,9 +1941,38 @@ def _cli() -> None:
 
     if not (args.snapshots or args.ocr):
         parser.error("No action specified: add --snapshots and/or --ocr (or use --list)")
+    if not args.keep_snapshots and not args.ocr:
+        parser.error("--no-keep-snapshots only makes sense with --ocr")
+    if args.ocr_batch > 1 and args.ocr_engine != "cli":
+        parser.error("--ocr-batch only applies to --ocr-engine cli")
+    if args.decoder == "opencv" and (args.keyframes or args.decoder_fps or args.decoder_width or args.decoder_gray):
+        parser.error("--keyframes/--decoder-fps/--decoder-width/--decoder-gray need --decoder ffmpeg")
 
+    ocr_cache = OcrCache(args.ocr_cache, args.ocr_cache_size) if args.ocr_cache else None
     for vid in work_videos:
-        process_video(vid, do_snaps=args.snapshots, do_ocr=args.ocr, interval=args.interval, lang=args.lang)
+        process_video(vid, do_snaps=args.snapshots, do_ocr=args.ocr, interval=args.interval, lang=args.lang,
+                      sampling=args.sampling, workers=args.workers, mode=args.mode, scan_step=args.scan_step,
+                      change_threshold=args.change_threshold, min_dwell=args.min_dwell, dedupe=args.dedupe,
+                      bisect_resolution=args.bisect_resolution,
+                      settle_frames=args.settle_frames, crop_slide=args.crop_slide, deskew=args.deskew, decoder=args.decoder, keyframes_only=args.keyframes,
+                      decoder_fps=args.decoder_fps, decoder_width=args.decoder_width, decoder_gray=args.decoder_gray,
+                      writer_threads=args.writer_threads, snapshot_format=args.snapshot_format,
+                      jpeg_quality=args.jpeg_quality, png_compression=args.png_compression, gray=args.gray,
+                      resume=args.resume, pipeline=args.pipeline, ocr_threads=args.ocr_threads,
+                      keep_snapshots=args.keep_snapshots, ocr_processes=args.ocr_processes, max_memory=args.max_memory,
+                      cv_threads=args.cv_threads, decoder_threads=args.decoder_threads, auto_threads=args.auto_threads, jobs=args.jobs,
+                      ocr_engine=args.ocr_engine, ocr_batch=args.ocr_batch, ocr_cache=ocr_cache,
+                      incremental_ocr=args.incremental_ocr)
+
+    if ocr_cache is not None:
+        stats = ocr_cache.stats()
+        ocr_cache.close()
+        print(f"OCR cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evicted']} evicted; "
+              f"{stats['entries']} entries ({stats['bytes'] / 2**20:.1f} MiB) in {ocr_cache.path}")
+
+    peak = _peak_rss()
+    if peak is not None:
+        print(f"Peak RSS: {peak[0] / 2**20:.0f} MiB (largest child process {peak[1] / 2**20:.0f} MiB)")
 
 if __name__ == "__main__":
     _cli()
\ No newline at end of file